@@ -1,126 +1,361 @@
+import asyncio
+import heapq
 import logging
-from typing import Dict, List, Any
-from datetime import datetime
+import math
+import re
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from operator import attrgetter
+from typing import Dict, List, Any, Callable, Mapping, NamedTuple, Set, Tuple
+from types import MappingProxyType
 
 logger = logging.getLogger(__name__)
 
+# Complication risk factors database, shared read-only across agent instances
+_COMPLICATION_RISKS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "cardiac_complications": MappingProxyType({
+        "name": "Cardiac Complications",
+        "risk_factors": ("chest_pain", "hypertension", "diabetes", "smoking", "age_over_65", "male", "family_history", "high_cholesterol"),
+        "indicators": ("high_blood_pressure", "rapid_heart_rate", "low_oxygen", "irregular_heartbeat"),
+        "severity_levels": MappingProxyType({
+            "low": "Monitor routinely",
+            "moderate": "Enhanced monitoring recommended",
+            "high": "Continuous monitoring required"
+        })
+    }),
+    "respiratory_complications": MappingProxyType({
+        "name": "Respiratory Complications",
+        "risk_factors": ("shortness_of_breath", "asthma", "copd", "smoking", "age_over_65", "pneumonia_history", "obesity"),
+        "indicators": ("rapid_breathing", "low_oxygen", "fever", "abnormal_breath_sounds"),
+        "severity_levels": MappingProxyType({
+            "low": "Monitor respiratory status",
+            "moderate": "Pulmonary function monitoring",
+            "high": "Continuous oxygen saturation monitoring"
+        })
+    }),
+    "infectious_complications": MappingProxyType({
+        "name": "Infectious Complications",
+        "risk_factors": ("fever", "immunocompromised", "diabetes", "recent_surgery", "age_over_65", "chronic_disease", "hospitalization"),
+        "indicators": ("fever", "rapid_heart_rate", "low_oxygen", "elevated_white_blood_cell_count"),
+        "severity_levels": MappingProxyType({
+            "low": "Watch for signs of infection",
+            "moderate": "Infection surveillance protocol",
+            "high": "Prophylactic antibiotics consideration"
+        })
+    }),
+    "neurological_complications": MappingProxyType({
+        "name": "Neurological Complications",
+        "risk_factors": ("headache", "dizziness", "hypertension", "diabetes", "age_over_65", "stroke_history", "seizure_history"),
+        "indicators": ("altered_mental_status", "high_blood_pressure", "asymmetric_reflexes", "abnormal_pupil_response"),
+        "severity_levels": MappingProxyType({
+            "low": "Neurological checks every 4 hours",
+            "moderate": "Neurological checks every 2 hours",
+            "high": "Continuous neurological monitoring"
+        })
+    }),
+    "renal_complications": MappingProxyType({
+        "name": "Renal Complications",
+        "risk_factors": ("diabetes", "hypertension", "age_over_65", "chronic_kidney_disease", "dehydration", "medication_nephrotoxicity"),
+        "indicators": ("decreased_urine_output", "elevated_creatinine", "fluid_retention", "electrolyte_imbalance"),
+        "severity_levels": MappingProxyType({
+            "low": "Monitor urine output and hydration",
+            "moderate": "Daily renal function tests",
+            "high": "Continuous renal monitoring"
+        })
+    }),
+    "metabolic_complications": MappingProxyType({
+        "name": "Metabolic Complications",
+        "risk_factors": ("diabetes", "obesity", "age_over_65", "chronic_disease", "medication_side_effects", "poor_nutrition"),
+        "indicators": ("abnormal_blood_sugar", "electrolyte_imbalance", "acid_base_disturbance", "altered_mental_status"),
+        "severity_levels": MappingProxyType({
+            "low": "Routine metabolic monitoring",
+            "moderate": "Enhanced metabolic surveillance",
+            "high": "Continuous metabolic monitoring"
+        })
+    })
+})
+
+# Prevention strategies per complication type
+_PREVENTION_STRATEGIES: Mapping[str, tuple] = MappingProxyType({
+    "cardiac_complications": (
+        "Continuous ECG monitoring",
+        "Frequent vital sign assessments",
+        "Maintain adequate oxygenation",
+        "Administer prescribed cardiac medications",
+        "Monitor cardiac enzymes",
+        "Ensure adequate perfusion"
+    ),
+    "respiratory_complications": (
+        "Pulmonary hygiene measures",
+        "Incentive spirometry",
+        "Adequate hydration",
+        "Positioning for optimal lung expansion",
+        "Monitor oxygen saturation",
+        "Early ambulation when appropriate"
+    ),
+    "infectious_complications": (
+        "Strict aseptic technique",
+        "Hand hygiene compliance",
+        "Wound care as indicated",
+        "Monitor for signs of infection",
+        "Maintain sterile environment",
+        "Prophylactic antibiotics if indicated"
+    ),
+    "neurological_complications": (
+        "Neurological assessments every 2 hours",
+        "Monitor level of consciousness",
+        "Assess pupils and motor function",
+        "Maintain head elevation if indicated",
+        "Monitor for signs of increased intracranial pressure",
+        "Ensure safety precautions"
+    ),
+    "renal_complications": (
+        "Monitor urine output hourly",
+        "Daily electrolyte and creatinine monitoring",
+        "Maintain adequate hydration",
+        "Avoid nephrotoxic medications",
+        "Monitor for signs of fluid overload",
+        "Adjust medications for renal function"
+    ),
+    "metabolic_complications": (
+        "Regular blood glucose monitoring",
+        "Electrolyte panel every 12 hours",
+        "Monitor for signs of dehydration",
+        "Ensure adequate nutrition",
+        "Watch for medication interactions",
+        "Adjust insulin/diabetic medications as needed"
+    )
+})
+
+_DEFAULT_STRATEGIES: tuple = ()
+
+# Medical history keywords that indicate each risk factor
+_FACTOR_HISTORY_KEYWORDS: Mapping[str, tuple] = MappingProxyType({
+    "hypertension": ("hypertension",),
+    "diabetes": ("diabetes",),
+    "smoking": ("smoking", "smoker"),
+    "asthma": ("asthma",),
+    "copd": ("copd", "chronic obstructive pulmonary"),
+    "immunocompromised": ("immunocompromised", "immunosuppressed"),
+    "recent_surgery": ("surgery",),
+    "chronic_kidney_disease": ("kidney", "renal"),
+    "obesity": ("obesity", "morbid"),
+    "chronic_disease": ("chronic",),
+    "family_history": ("family",),
+    "high_cholesterol": ("cholesterol", "hyperlipidemia"),
+    "pneumonia_history": ("pneumonia",),
+    "stroke_history": ("stroke", "cva"),
+    "seizure_history": ("seizure", "epilepsy"),
+    "hospitalization": ("hospital",),
+    "medication_nephrotoxicity": ("nsaid", "contrast"),
+    "poor_nutrition": ("malnutrition", "underweight")
+})
+
+# Primary concern name keywords that indicate each risk factor
+_FACTOR_CONCERN_KEYWORDS: Mapping[str, tuple] = MappingProxyType({
+    "chest_pain": ("chest",),
+    "shortness_of_breath": ("breath", "dyspnea"),
+    "headache": ("headache",),
+    "dizziness": ("dizziness", "vertigo"),
+    "fever": ("fever",)
+})
+
+# Primary concern type keywords that suggest each complication category
+_COMPLICATION_CONCERN_TYPES: Mapping[str, tuple] = MappingProxyType({
+    "cardiac_complications": ("cardiac", "heart"),
+    "respiratory_complications": ("respiratory", "lung"),
+    "neurological_complications": ("neurological", "brain"),
+    "renal_complications": ("renal", "kidney"),
+    "metabolic_complications": ("metabolic", "diabetes")
+})
+
+# Every factor implied by a keyword match, including factors whose keywords
+# are contained in a longer keyword (e.g. "chronic" in "chronic obstructive pulmonary")
+_HISTORY_KEYWORD_FACTORS: Dict[str, frozenset] = {
+    keyword: frozenset(
+        factor for factor, factor_keywords in _FACTOR_HISTORY_KEYWORDS.items()
+        if any(k in keyword for k in factor_keywords)
+    )
+    for keywords in _FACTOR_HISTORY_KEYWORDS.values()
+    for keyword in keywords
+}
+
+# Single-pass matcher over all history keywords; the lookahead reports a match
+# at every position and longest-first ordering picks the most specific keyword
+_HISTORY_KEYWORD_RE = re.compile(
+    "(?=(%s))" % "|".join(re.escape(k) for k in sorted(_HISTORY_KEYWORD_FACTORS, key=len, reverse=True))
+)
+
+def _scan_history_factors(history_lc: List[str]) -> Set[str]:
+    """Return the set of risk factors mentioned anywhere in the lowercased medical history."""
+    history_blob = "\n".join(history_lc)
+    factors = set()
+    for match in _HISTORY_KEYWORD_RE.finditer(history_blob):
+        factors.update(_HISTORY_KEYWORD_FACTORS[match.group(1)])
+    return factors
+
+# Bit assigned to every distinct risk factor and indicator across complications
+_FACTOR_BITS: Dict[str, int] = {
+    factor: 1 << i
+    for i, factor in enumerate(dict.fromkeys(
+        f for comp in _COMPLICATION_RISKS.values() for f in comp["risk_factors"]
+    ))
+}
+_INDICATOR_BITS: Dict[str, int] = {
+    indicator: 1 << i
+    for i, indicator in enumerate(dict.fromkeys(
+        ind for comp in _COMPLICATION_RISKS.values() for ind in comp["indicators"]
+    ))
+}
+
+# Per-complication scoring profile, unpacked once per loop iteration:
+# (key, name, risk factor mask, indicator mask, concern type keywords, severity levels)
+_COMPLICATION_PROFILES: Tuple[Tuple[str, str, int, int, tuple, Mapping[str, str]], ...] = tuple(
+    (
+        comp_key,
+        comp["name"],
+        sum(_FACTOR_BITS[f] for f in comp["risk_factors"]),
+        sum(_INDICATOR_BITS[i] for i in comp["indicators"]),
+        _COMPLICATION_CONCERN_TYPES.get(comp_key, ()),
+        comp["severity_levels"]
+    )
+    for comp_key, comp in _COMPLICATION_RISKS.items()
+)
+
+@lru_cache(maxsize=512)
+def _decode_factors(comp_key: str, mask: int) -> Tuple[str, ...]:
+    """Names of the complication's risk factors whose bits are set in mask, in declared order."""
+    return tuple(f for f in _COMPLICATION_RISKS[comp_key]["risk_factors"] if mask & _FACTOR_BITS[f])
+
+@lru_cache(maxsize=512)
+def _decode_indicators(comp_key: str, mask: int) -> Tuple[str, ...]:
+    """Names of the complication's indicators whose bits are set in mask, in declared order."""
+    return tuple(i for i in _COMPLICATION_RISKS[comp_key]["indicators"] if mask & _INDICATOR_BITS[i])
+
+_RISK_SCORE_KEY = attrgetter("risk_score")
+
+@dataclass(frozen=True, slots=True)
+class ComplicationPrediction:
+    """A single predicted complication; serialized to a dict at the API boundary."""
+    complication: str
+    complication_key: str
+    risk_score: float
+    risk_level: str
+    risk_factors_present: Tuple[str, ...]
+    indicators_present: Tuple[str, ...]
+    prevention_strategies: tuple
+    monitoring_recommendations: str
+
+_NAN = float("nan")
+
+class _Vitals(NamedTuple):
+    """Numeric vital sign readings, NaN when missing or unparseable."""
+    temperature: float
+    systolic: float
+    heart_rate: float
+    respiratory_rate: float
+    oxygen_saturation: float
+
+# Numeric reading formats accepted by int() and float() for vital signs
+_INT_RE = re.compile(r"\s*[+-]?\d+\s*")
+_FLOAT_RE = re.compile(r"\s*[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\s*")
+
+# Leading systolic number of a "systolic/diastolic" blood pressure reading
+_BP_RE = re.compile(r"\s*([+-]?\d+)\s*(?:/|$)")
+
+def _is_finite_number(value: Any) -> bool:
+    """True for real numbers that int() and float() can convert."""
+    return isinstance(value, (int, float)) and math.isfinite(value)
+
+def _parse_int(value: Any) -> float:
+    """Integer vital reading from a number or digit string; validated up front instead of via exceptions."""
+    if isinstance(value, str):
+        return int(value) if _INT_RE.fullmatch(value) else _NAN
+    return int(value) if _is_finite_number(value) else _NAN
+
+def _parse_float(value: Any) -> float:
+    """Decimal vital reading from a number or numeric string."""
+    if isinstance(value, str):
+        return float(value) if _FLOAT_RE.fullmatch(value) else _NAN
+    return float(value) if _is_finite_number(value) else _NAN
+
+def _parse_percentage(value: Any) -> float:
+    """Decimal reading from a number or a string such as "95%"."""
+    return _parse_float(value.replace("%", "") if isinstance(value, str) else value)
+
+def _parse_systolic(bp: Any) -> float:
+    """Extract the systolic value from a blood pressure reading without splitting it."""
+    match = _BP_RE.match(bp) if isinstance(bp, str) else None
+    return int(match.group(1)) if match else _NAN
+
+def _parse_vital(value: Any, parse: Callable[[Any], float]) -> float:
+    """Parse a single vital sign reading, returning NaN if it is missing or malformed."""
+    return parse(value) if value else _NAN
+
+# Threshold test for each indicator derived from vital signs. NaN readings compare
+# False, so missing vitals never trigger an indicator. Indicators without an entry
+# (altered mental status, breath sounds, lab results, neurological exam findings)
+# would come from assessments not yet captured and are never present.
+_VITAL_INDICATOR_CHECKS: Mapping[str, Callable[[_Vitals], bool]] = MappingProxyType({
+    "fever": lambda v: v.temperature > 38.0,
+    "high_blood_pressure": lambda v: v.systolic > 140,
+    "rapid_heart_rate": lambda v: v.heart_rate > 100,
+    "rapid_breathing": lambda v: v.respiratory_rate > 20,
+    "low_oxygen": lambda v: v.oxygen_saturation < 95,
+    # Irregular if heart rate is very high or shows concerning patterns
+    "irregular_heartbeat": lambda v: v.heart_rate > 120
+})
+
+# Indicators that need exam or lab data not yet captured; always absent
+_PLACEHOLDER_INDICATORS = frozenset(_INDICATOR_BITS).difference(_VITAL_INDICATOR_CHECKS)
+
+# Only indicators backed by a vital sign check are evaluated per patient
+_MEASURED_INDICATOR_BITS: Dict[str, int] = {
+    indicator: bit for indicator, bit in _INDICATOR_BITS.items() if indicator not in _PLACEHOLDER_INDICATORS
+}
+
+class _PatientContext(NamedTuple):
+    """Normalized patient fields consulted by the risk factor checks."""
+    symptoms: str
+    age: int
+    gender: str
+    history_factors: Set[str]
+    concern_names: str
+
+def _make_factor_checker(factor: str) -> Callable[[_PatientContext], bool]:
+    """Build a check for one risk factor that runs only the tests that can match it."""
+    checks = []
+    # Medical history
+    if factor in _FACTOR_HISTORY_KEYWORDS:
+        checks.append(lambda patient: factor in patient.history_factors)
+    # Age
+    if factor == "age_over_65":
+        checks.append(lambda patient: patient.age > 65)
+    # Gender
+    if factor == "male":
+        checks.append(lambda patient: patient.gender == "male")
+    # Symptoms analysis concerns
+    concern_keywords = _FACTOR_CONCERN_KEYWORDS.get(factor)
+    if concern_keywords:
+        checks.append(lambda patient: any(keyword in patient.concern_names for keyword in concern_keywords))
+    # Any factor may be named in the chief complaint; the free-text scan runs last
+    checks.append(lambda patient: factor in patient.symptoms)
+    
+    checks = tuple(checks)
+    return lambda patient: any(check(patient) for check in checks)
+
+# Specialized presence check for every known risk factor
+_FACTOR_CHECKERS: Dict[str, Callable[[_PatientContext], bool]] = {
+    factor: _make_factor_checker(factor) for factor in _FACTOR_BITS
+}
+
 class PredictiveAnalyticsAgent:
     """
     Agent for forecasting potential complications based on patient history and current condition.
     """
     
-    def __init__(self):
-        # Complication risk factors database with more detailed information
-        self.complication_risks = {
-            "cardiac_complications": {
-                "name": "Cardiac Complications",
-                "risk_factors": ["chest_pain", "hypertension", "diabetes", "smoking", "age_over_65", "male", "family_history", "high_cholesterol"],
-                "indicators": ["high_blood_pressure", "rapid_heart_rate", "low_oxygen", "irregular_heartbeat"],
-                "severity_levels": {
-                    "low": "Monitor routinely",
-                    "moderate": "Enhanced monitoring recommended",
-                    "high": "Continuous monitoring required"
-                },
-                "prevention_strategies": [
-                    "Continuous ECG monitoring",
-                    "Frequent vital sign assessments",
-                    "Maintain adequate oxygenation",
-                    "Administer prescribed cardiac medications",
-                    "Monitor cardiac enzymes",
-                    "Ensure adequate perfusion"
-                ]
-            },
-            "respiratory_complications": {
-                "name": "Respiratory Complications",
-                "risk_factors": ["shortness_of_breath", "asthma", "copd", "smoking", "age_over_65", "pneumonia_history", "obesity"],
-                "indicators": ["rapid_breathing", "low_oxygen", "fever", "abnormal_breath_sounds"],
-                "severity_levels": {
-                    "low": "Monitor respiratory status",
-                    "moderate": "Pulmonary function monitoring",
-                    "high": "Continuous oxygen saturation monitoring"
-                },
-                "prevention_strategies": [
-                    "Pulmonary hygiene measures",
-                    "Incentive spirometry",
-                    "Adequate hydration",
-                    "Positioning for optimal lung expansion",
-                    "Monitor oxygen saturation",
-                    "Early ambulation when appropriate"
-                ]
-            },
-            "infectious_complications": {
-                "name": "Infectious Complications",
-                "risk_factors": ["fever", "immunocompromised", "diabetes", "recent_surgery", "age_over_65", "chronic_disease", "hospitalization"],
-                "indicators": ["fever", "rapid_heart_rate", "low_oxygen", "elevated_white_blood_cell_count"],
-                "severity_levels": {
-                    "low": "Watch for signs of infection",
-                    "moderate": "Infection surveillance protocol",
-                    "high": "Prophylactic antibiotics consideration"
-                },
-                "prevention_strategies": [
-                    "Strict aseptic technique",
-                    "Hand hygiene compliance",
-                    "Wound care as indicated",
-                    "Monitor for signs of infection",
-                    "Maintain sterile environment",
-                    "Prophylactic antibiotics if indicated"
-                ]
-            },
-            "neurological_complications": {
-                "name": "Neurological Complications",
-                "risk_factors": ["headache", "dizziness", "hypertension", "diabetes", "age_over_65", "stroke_history", "seizure_history"],
-                "indicators": ["altered_mental_status", "high_blood_pressure", "asymmetric_reflexes", "abnormal_pupil_response"],
-                "severity_levels": {
-                    "low": "Neurological checks every 4 hours",
-                    "moderate": "Neurological checks every 2 hours",
-                    "high": "Continuous neurological monitoring"
-                },
-                "prevention_strategies": [
-                    "Neurological assessments every 2 hours",
-                    "Monitor level of consciousness",
-                    "Assess pupils and motor function",
-                    "Maintain head elevation if indicated",
-                    "Monitor for signs of increased intracranial pressure",
-                    "Ensure safety precautions"
-                ]
-            },
-            "renal_complications": {
-                "name": "Renal Complications",
-                "risk_factors": ["diabetes", "hypertension", "age_over_65", "chronic_kidney_disease", "dehydration", "medication_nephrotoxicity"],
-                "indicators": ["decreased_urine_output", "elevated_creatinine", "fluid_retention", "electrolyte_imbalance"],
-                "severity_levels": {
-                    "low": "Monitor urine output and hydration",
-                    "moderate": "Daily renal function tests",
-                    "high": "Continuous renal monitoring"
-                },
-                "prevention_strategies": [
-                    "Monitor urine output hourly",
-                    "Daily electrolyte and creatinine monitoring",
-                    "Maintain adequate hydration",
-                    "Avoid nephrotoxic medications",
-                    "Monitor for signs of fluid overload",
-                    "Adjust medications for renal function"
-                ]
-            },
-            "metabolic_complications": {
-                "name": "Metabolic Complications",
-                "risk_factors": ["diabetes", "obesity", "age_over_65", "chronic_disease", "medication_side_effects", "poor_nutrition"],
-                "indicators": ["abnormal_blood_sugar", "electrolyte_imbalance", "acid_base_disturbance", "altered_mental_status"],
-                "severity_levels": {
-                    "low": "Routine metabolic monitoring",
-                    "moderate": "Enhanced metabolic surveillance",
-                    "high": "Continuous metabolic monitoring"
-                },
-                "prevention_strategies": [
-                    "Regular blood glucose monitoring",
-                    "Electrolyte panel every 12 hours",
-                    "Monitor for signs of dehydration",
-                    "Ensure adequate nutrition",
-                    "Watch for medication interactions",
-                    "Adjust insulin/diabetic medications as needed"
-                ]
-            }
-        }
+    complication_risks = _COMPLICATION_RISKS
     
     def run(self, patient_data: dict, symptoms_analysis: dict, risk_assessment: dict, 
             treatment_recommendations: dict) -> Dict[str, Any]:
@@ -136,26 +371,37 @@ class PredictiveAnalyticsAgent:
         Returns:
             Dict containing predicted complications with risk levels
         """
+        return self._forecast(patient_data, symptoms_analysis, risk_assessment, treatment_recommendations,
+                              time.strftime("%Y-%m-%dT%H:%M:%S"))
+    
+    def _forecast(self, patient_data: dict, symptoms_analysis: dict, risk_assessment: dict,
+                  treatment_recommendations: dict, timestamp: str) -> Dict[str, Any]:
+        """Forecast complications for one patient, stamping the result with the given timestamp."""
         try:
             logger.info("Generating predictive analytics for complications")
             
             # Extract relevant information
             symptoms = patient_data.get("chief_complaint", "").lower()
-            vitals = patient_data.get("vital_signs", {})
+            vitals = self._parse_vitals(patient_data.get("vital_signs", {}))
             age = patient_data.get("age", 0)
-            gender = patient_data.get("gender", "")
-            medical_history = patient_data.get("medical_history", [])
+            gender = patient_data.get("gender", "").lower()
+            history_lc = tuple(item.lower() for item in patient_data.get("medical_history", []))
+            primary_concerns = symptoms_analysis.get("primary_concerns", []) if symptoms_analysis else []
+            concern_names = "\n".join(concern.get("name", "").lower() for concern in primary_concerns)
+            concern_types = tuple(concern.get("type", "").lower() for concern in primary_concerns)
             
-            # Generate complication predictions
-            predictions = self._predict_complications(symptoms, vitals, age, gender, medical_history, symptoms_analysis)
+            # Generate complication predictions; identical normalized inputs hit the cache
+            predictions = self._predict_complications(
+                symptoms, vitals, age, gender, history_lc, concern_names, concern_types
+            )
             
-            # Rank predictions based on risk score
-            ranked_predictions = sorted(predictions, key=lambda x: x["risk_score"], reverse=True)
+            # Predictions come back already ranked by risk score
+            ranked_predictions = [asdict(p) for p in predictions]
             
             result = {
                 "complication_predictions": ranked_predictions,
                 "total_predictions": len(ranked_predictions),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": timestamp,
                 "analysis_factors": {
                     "symptom_analysis": bool(symptoms_analysis),
                     "risk_assessment": bool(risk_assessment),
@@ -163,56 +409,100 @@ class PredictiveAnalyticsAgent:
                 }
             }
             
-            logger.info(f"Generated {len(ranked_predictions)} complication predictions")
+            logger.info("Generated %d complication predictions", len(ranked_predictions))
             return result
             
         except Exception as e:
-            logger.error(f"Error in predictive analytics generation: {e}")
+            logger.error("Error in predictive analytics generation: %s", e)
             return {
                 "complication_predictions": [],
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp
             }
     
-    def _predict_complications(self, symptoms: str, vitals: dict, age: int, gender: str, 
-                              medical_history: List[str], symptoms_analysis: dict) -> List[Dict[str, Any]]:
-        """Predict potential complications and their risk levels."""
+    def run_batch(self, cases: List[dict]) -> List[Dict[str, Any]]:
+        """
+        Forecast potential complications for a cohort of patients.
+        
+        Args:
+            cases: One dict per patient holding the run() arguments by name
+                (patient_data, symptoms_analysis, risk_assessment, treatment_recommendations)
+            
+        Returns:
+            List of run() results in the same order as cases
+        """
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+        return [
+            self._forecast(
+                case.get("patient_data", {}),
+                case.get("symptoms_analysis") or {},
+                case.get("risk_assessment") or {},
+                case.get("treatment_recommendations") or {},
+                timestamp
+            )
+            for case in cases
+        ]
+    
+    async def arun(self, patient_data: dict, symptoms_analysis: dict, risk_assessment: dict,
+                   treatment_recommendations: dict) -> Dict[str, Any]:
+        """
+        Async variant of run() that executes in a worker thread so it can be
+        gathered alongside other agents without blocking the event loop.
+        """
+        return await asyncio.to_thread(
+            self.run, patient_data, symptoms_analysis, risk_assessment, treatment_recommendations
+        )
+    
+    @classmethod
+    @lru_cache(maxsize=2048)
+    def _predict_complications(cls, symptoms: str, vitals: _Vitals, age: int, gender: str,
+                               history_lc: Tuple[str, ...], concern_names: str,
+                               concern_types: Tuple[str, ...]) -> Tuple[ComplicationPrediction, ...]:
+        """
+        Predict potential complications and their risk levels.
+        
+        All arguments are normalized and hashable so results can be memoized
+        across requests; the returned predictions are immutable.
+        """
         predictions = []
         
+        # Scan the medical history once for every risk factor it mentions
+        history_factors = _scan_history_factors(history_lc)
+        
+        # Evaluate each distinct risk factor and indicator once for the patient
+        patient = _PatientContext(symptoms, age, gender, history_factors, concern_names)
+        present_factors = 0
+        for factor, bit in _FACTOR_BITS.items():
+            if cls._check_risk_factor(factor, patient):
+                present_factors |= bit
+        present_indicators = 0
+        for indicator, bit in _MEASURED_INDICATOR_BITS.items():
+            if cls._check_vital_indicator(indicator, vitals):
+                present_indicators |= bit
+        
+        # Nothing can score without an active factor, indicator or concern
+        if not (present_factors or present_indicators or concern_types):
+            return ()
+        
         # Check each complication type
-        for comp_key, comp_data in self.complication_risks.items():
-            risk_score = 0
-            risk_factors_present = []
-            indicators_present = []
+        for comp_key, name, factor_mask, indicator_mask, concern_type_keywords, severity_levels in _COMPLICATION_PROFILES:
+            matched_factors = present_factors & factor_mask
+            matched_indicators = present_indicators & indicator_mask
             
-            # Check risk factors from medical history and demographics
-            risk_factors = comp_data["risk_factors"]
-            for factor in risk_factors:
-                if self._check_risk_factor(factor, symptoms, age, gender, medical_history, symptoms_analysis):
-                    risk_score += 1.2  # Increased weight for comprehensive matching
-                    risk_factors_present.append(factor)
+            # Skip complications none of the patient's findings contribute to
+            if not (matched_factors or matched_indicators or (concern_type_keywords and concern_types)):
+                continue
             
-            # Check vital sign indicators
-            indicators = comp_data["indicators"]
-            for indicator in indicators:
-                if self._check_vital_indicator(indicator, vitals):
-                    risk_score += 0.8
-                    indicators_present.append(indicator)
+            # Risk factors from medical history and demographics weigh 1.2, vital sign indicators 0.8
+            risk_score = 1.2 * matched_factors.bit_count() + 0.8 * matched_indicators.bit_count()
+            risk_factors_present = _decode_factors(comp_key, matched_factors)
+            indicators_present = _decode_indicators(comp_key, matched_indicators)
             
             # Adjust for symptom severity if available
-            if symptoms_analysis:
+            if concern_type_keywords:
                 # Check if symptoms suggest this type of complication
-                primary_concerns = symptoms_analysis.get("primary_concerns", [])
-                for concern in primary_concerns:
-                    concern_type = concern.get("type", "").lower()
-                    concern_significance = concern.get("significance", "").lower()
-                    
-                    # Match concern types to complication categories
-                    if (("cardiac" in concern_type or "heart" in concern_type) and "cardiac" in comp_key) or \
-                       (("respiratory" in concern_type or "lung" in concern_type) and "respiratory" in comp_key) or \
-                       (("neurological" in concern_type or "brain" in concern_type) and "neurological" in comp_key) or \
-                       (("renal" in concern_type or "kidney" in concern_type) and "renal" in comp_key) or \
-                       (("metabolic" in concern_type or "diabetes" in concern_type) and "metabolic" in comp_key):
+                for concern_type in concern_types:
+                    if any(keyword in concern_type for keyword in concern_type_keywords):
                         risk_score += 0.5
             
             # Determine risk level with more granular scoring
@@ -225,174 +515,41 @@ class PredictiveAnalyticsAgent:
             
             # Only include complications with some risk
             if risk_score > 0:
-                predictions.append({
-                    "complication": comp_data["name"],
-                    "complication_key": comp_key,
-                    "risk_score": round(risk_score, 2),
-                    "risk_level": risk_level,
-                    "risk_factors_present": risk_factors_present,
-                    "indicators_present": indicators_present,
-                    "prevention_strategies": comp_data["prevention_strategies"],
-                    "monitoring_recommendations": comp_data["severity_levels"].get(risk_level, "Standard monitoring")
-                })
+                predictions.append(ComplicationPrediction(
+                    complication=name,
+                    complication_key=comp_key,
+                    risk_score=round(risk_score, 2),
+                    risk_level=risk_level,
+                    risk_factors_present=risk_factors_present,
+                    indicators_present=indicators_present,
+                    prevention_strategies=cls._get_prevention_strategies(comp_key),
+                    monitoring_recommendations=severity_levels.get(risk_level, "Standard monitoring")
+                ))
         
-        # Sort by risk score and limit to top 4 complications for better performance
-        predictions = sorted(predictions, key=lambda x: x["risk_score"], reverse=True)
-        return predictions[:4]  # Return only top 4 instead of all
+        # Select the top 4 complications by risk score without sorting the rest
+        return tuple(heapq.nlargest(4, predictions, key=_RISK_SCORE_KEY))
+    
+    @staticmethod
+    def _get_prevention_strategies(complication_key: str) -> tuple:
+        """Get prevention strategies for a complication type."""
+        return _PREVENTION_STRATEGIES.get(complication_key, _DEFAULT_STRATEGIES)
     
-    def _check_risk_factor(self, factor: str, symptoms: str, age: int, gender: str, 
-                          medical_history: List[str], symptoms_analysis: dict) -> bool:
+    @staticmethod
+    def _check_risk_factor(factor: str, patient: _PatientContext) -> bool:
         """Check if a risk factor is present."""
-        # Check symptoms
-        if factor in symptoms:
-            return True
-            
-        # Check age
-        if factor == "age_over_65" and age > 65:
-            return True
-            
-        # Check gender
-        if factor == "male" and gender.lower() == "male":
-            return True
-            
-        # Check medical history
-        for history_item in medical_history:
-            history_lower = history_item.lower()
-            if factor == "hypertension" and "hypertension" in history_lower:
-                return True
-            elif factor == "diabetes" and "diabetes" in history_lower:
-                return True
-            elif factor == "smoking" and ("smoking" in history_lower or "smoker" in history_lower):
-                return True
-            elif factor == "asthma" and "asthma" in history_lower:
-                return True
-            elif factor == "copd" and ("copd" in history_lower or "chronic obstructive pulmonary" in history_lower):
-                return True
-            elif factor == "immunocompromised" and ("immunocompromised" in history_lower or "immunosuppressed" in history_lower):
-                return True
-            elif factor == "recent_surgery" and "surgery" in history_lower:
-                return True
-            elif factor == "chronic_kidney_disease" and ("kidney" in history_lower or "renal" in history_lower):
-                return True
-            elif factor == "obesity" and ("obesity" in history_lower or "morbid" in history_lower):
-                return True
-            elif factor == "chronic_disease" and ("chronic" in history_lower):
-                return True
-            elif factor == "family_history" and "family" in history_lower:
-                return True
-            elif factor == "high_cholesterol" and ("cholesterol" in history_lower or "hyperlipidemia" in history_lower):
-                return True
-            elif factor == "pneumonia_history" and "pneumonia" in history_lower:
-                return True
-            elif factor == "stroke_history" and ("stroke" in history_lower or "cva" in history_lower):
-                return True
-            elif factor == "seizure_history" and ("seizure" in history_lower or "epilepsy" in history_lower):
-                return True
-            elif factor == "hospitalization" and ("hospital" in history_lower):
-                return True
-            elif factor == "medication_nephrotoxicity" and ("nsaid" in history_lower or "contrast" in history_lower):
-                return True
-            elif factor == "poor_nutrition" and ("malnutrition" in history_lower or "underweight" in history_lower):
-                return True
-                
-        # Check symptoms analysis for additional factors
-        if symptoms_analysis:
-            primary_concerns = symptoms_analysis.get("primary_concerns", [])
-            for concern in primary_concerns:
-                concern_name = concern.get("name", "").lower()
-                concern_type = concern.get("type", "").lower()
-                
-                if factor == "chest_pain" and "chest" in concern_name:
-                    return True
-                elif factor == "shortness_of_breath" and ("breath" in concern_name or "dyspnea" in concern_name):
-                    return True
-                elif factor == "headache" and "headache" in concern_name:
-                    return True
-                elif factor == "dizziness" and ("dizziness" in concern_name or "vertigo" in concern_name):
-                    return True
-                elif factor == "fever" and "fever" in concern_name:
-                    return True
-                    
-        return False
+        return _FACTOR_CHECKERS[factor](patient)
+    
+    def _parse_vitals(self, vitals: dict) -> _Vitals:
+        """Parse raw vital sign readings once; missing or malformed values become NaN."""
+        return _Vitals(
+            temperature=_parse_vital(vitals.get("temperature"), _parse_float),
+            systolic=_parse_vital(vitals.get("blood_pressure"), _parse_systolic),
+            heart_rate=_parse_vital(vitals.get("heart_rate"), _parse_int),
+            respiratory_rate=_parse_vital(vitals.get("respiratory_rate"), _parse_int),
+            oxygen_saturation=_parse_vital(vitals.get("oxygen_saturation"), _parse_percentage)
+        )
     
-    def _check_vital_indicator(self, indicator: str, vitals: dict) -> bool:
+    @staticmethod
+    def _check_vital_indicator(indicator: str, vitals: _Vitals) -> bool:
         """Check if a vital sign indicator is present."""
-        if indicator == "fever":
-            temp = vitals.get("temperature")
-            if temp:
-                try:
-                    return float(temp) > 38.0
-                except (ValueError, TypeError):
-                    return False
-        elif indicator == "high_blood_pressure":
-            bp = vitals.get("blood_pressure")
-            if bp:
-                try:
-                    systolic = int(bp.split("/")[0])
-                    return systolic > 140
-                except (ValueError, IndexError, TypeError):
-                    return False
-        elif indicator == "rapid_heart_rate":
-            hr = vitals.get("heart_rate")
-            if hr:
-                try:
-                    return int(hr) > 100
-                except (ValueError, TypeError):
-                    return False
-        elif indicator == "rapid_breathing":
-            rr = vitals.get("respiratory_rate")
-            if rr:
-                try:
-                    return int(rr) > 20
-                except (ValueError, TypeError):
-                    return False
-        elif indicator == "low_oxygen":
-            oxygen = vitals.get("oxygen_saturation")
-            if oxygen:
-                try:
-                    return float(oxygen.replace("%", "")) < 95
-                except (ValueError, TypeError):
-                    return False
-        elif indicator == "altered_mental_status":
-            # This would typically come from a separate assessment
-            return False  # Placeholder
-        elif indicator == "irregular_heartbeat":
-            hr = vitals.get("heart_rate")
-            if hr:
-                try:
-                    # Irregular if heart rate is very high or shows concerning patterns
-                    return int(hr) > 120
-                except (ValueError, TypeError):
-                    return False
-        elif indicator == "abnormal_breath_sounds":
-            # Placeholder - would come from physical exam
-            return False
-        elif indicator == "elevated_white_blood_cell_count":
-            # Placeholder - would come from lab results
-            return False
-        elif indicator == "decreased_urine_output":
-            # Placeholder - would come from intake/output monitoring
-            return False
-        elif indicator == "elevated_creatinine":
-            # Placeholder - would come from lab results
-            return False
-        elif indicator == "fluid_retention":
-            # Placeholder - would come from physical exam
-            return False
-        elif indicator == "electrolyte_imbalance":
-            # Placeholder - would come from lab results
-            return False
-        elif indicator == "acid_base_disturbance":
-            # Placeholder - would come from lab results
-            return False
-        elif indicator == "abnormal_blood_sugar":
-            # Placeholder - would come from lab results
-            return False
-        elif indicator == "asymmetric_reflexes":
-            # Placeholder - would come from neurological exam
-            return False
-        elif indicator == "abnormal_pupil_response":
-            # Placeholder - would come from neurological exam
-            return False
-                
-        return False
\ No newline at end of file
+        return _VITAL_INDICATOR_CHECKS[indicator](vitals)
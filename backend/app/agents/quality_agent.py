@@ -1,42 +1,83 @@
 import re
+from collections import Counter
 from typing import Dict, List, Any
 from datetime import datetime
+from itertools import chain
+from types import MappingProxyType
 from app.core.agent_memory import get_agent_memory
 
+# Critical presentations that warrant immediate attention
+_CRITICAL_SYMPTOMS_RE = re.compile(r"chest pain|shortness of breath|loss of consciousness")
+
+# "systolic/diastolic" with the same sign and whitespace tolerance as int()
+_BP_RE = re.compile(r"^\s*([+-]?\d+)\s*/\s*([+-]?\d+)\s*$")
+
+# Treatment keywords in priority order; each recommendation yields at most one treatment
+_TREATMENT_KEYWORDS = (
+    ("aspirin", "aspirin"),
+    ("nitroglycerin", "nitroglycerin"),
+    ("oxygen", "oxygen"),
+    ("antibiotic", "antibiotics"),
+)
+
+# Quality check criteria
+_QUALITY_CRITERIA = MappingProxyType({
+    "completeness": MappingProxyType({
+        "required_sections": ("patient_data", "symptoms_analysis", "risk_assessment",
+                              "treatment_recommendations", "followup_plan"),
+        "minimum_recommendations": 3,
+        "required_vitals": ("heart_rate", "blood_pressure", "temperature")
+    }),
+    "consistency": MappingProxyType({
+        "risk_alignment": ("symptoms_severity", "vital_abnormalities", "risk_score"),
+        "treatment_alignment": ("diagnosed_conditions", "recommended_treatments", "risk_level"),
+        "followup_alignment": ("treatment_plan", "risk_level", "patient_complexity")
+    }),
+    "safety": MappingProxyType({
+        "critical_findings": ("chest_pain", "shortness_of_breath", "severe_vitals"),
+        "contraindications": ("active_bleeding", "severe_liver_disease", "pregnancy"),
+        "interaction_warnings": ("high_risk_interactions", "moderate_risk_interactions")
+    })
+})
+
+# Quality scoring weights
+_QUALITY_WEIGHTS = MappingProxyType({
+    "completeness": 0.3,
+    "consistency": 0.4,
+    "safety": 0.3
+})
+
+# Weights in (completeness, consistency, safety) order for the overall score
+_SCORE_WEIGHTS = (
+    _QUALITY_WEIGHTS["completeness"], _QUALITY_WEIGHTS["consistency"], _QUALITY_WEIGHTS["safety"]
+)
+
+_REQUIRED_VITALS = _QUALITY_CRITERIA["completeness"]["required_vitals"]
+
+# Symptom severity lookup indexed by (critical, more than two, any) concern bits
+_CRITICAL_CONCERNS = frozenset({"chest pain", "shortness of breath", "loss of consciousness"})
+_SEVERITY_TABLE = (0.1, 0.4, 0.7, 0.7, 0.9, 0.9, 0.9, 0.9)
+
+# Treatments expected for each diagnosed condition category
+_CONDITION_TREATMENTS = MappingProxyType({
+    "cardiovascular": frozenset({"aspirin", "nitroglycerin"}),
+    "respiratory": frozenset({"oxygen"}),
+    "infectious": frozenset({"antibiotics"})
+})
+
 class QualityAssuranceAgent:
     """
     Agent to review recommendations for consistency and completeness.
     Provides quality checks on all agent outputs to ensure clinical safety and completeness.
     """
+    __slots__ = ("memory",)
+
+    # Shared, read-only review configuration
+    quality_criteria = _QUALITY_CRITERIA
+    quality_weights = _QUALITY_WEIGHTS
+
     def __init__(self):
         self.memory = get_agent_memory()
-        
-        # Quality check criteria
-        self.quality_criteria = {
-            "completeness": {
-                "required_sections": ["patient_data", "symptoms_analysis", "risk_assessment", 
-                                    "treatment_recommendations", "followup_plan"],
-                "minimum_recommendations": 3,
-                "required_vitals": ["heart_rate", "blood_pressure", "temperature"]
-            },
-            "consistency": {
-                "risk_alignment": ["symptoms_severity", "vital_abnormalities", "risk_score"],
-                "treatment_alignment": ["diagnosed_conditions", "recommended_treatments", "risk_level"],
-                "followup_alignment": ["treatment_plan", "risk_level", "patient_complexity"]
-            },
-            "safety": {
-                "critical_findings": ["chest_pain", "shortness_of_breath", "severe_vitals"],
-                "contraindications": ["active_bleeding", "severe_liver_disease", "pregnancy"],
-                "interaction_warnings": ["high_risk_interactions", "moderate_risk_interactions"]
-            }
-        }
-        
-        # Quality scoring weights
-        self.quality_weights = {
-            "completeness": 0.3,
-            "consistency": 0.4,
-            "safety": 0.3
-        }
 
     def run(self, patient_data: dict, symptoms_analysis: dict, risk_assessment: dict,
             treatment_recommendations: dict, followup_plan: dict, 
@@ -84,24 +125,20 @@ class QualityAssuranceAgent:
                            drug_interactions: dict, specialist_recommendations: dict) -> dict:
         """Check completeness of all agent outputs."""
         issues = []
-        score = 1.0
         
         # Check required sections
-        required_sections = {
-            "patient_data": patient_data,
-            "symptoms_analysis": symptoms_analysis,
-            "risk_assessment": risk_assessment,
-            "treatment_recommendations": treatment_recommendations,
-            "followup_plan": followup_plan,
-            "drug_interactions": drug_interactions,
-            "specialist_recommendations": specialist_recommendations
-        }
+        required_sections = (
+            ("patient_data", patient_data),
+            ("symptoms_analysis", symptoms_analysis),
+            ("risk_assessment", risk_assessment),
+            ("treatment_recommendations", treatment_recommendations),
+            ("followup_plan", followup_plan),
+            ("drug_interactions", drug_interactions),
+            ("specialist_recommendations", specialist_recommendations)
+        )
         
-        missing_sections = []
-        for section_name, section_data in required_sections.items():
-            if not section_data:
-                missing_sections.append(section_name)
-                score -= 0.15
+        missing_sections = [section_name for section_name, section_data in required_sections if not section_data]
+        score = 1.0 - 0.15 * len(missing_sections)
         
         if missing_sections:
             issues.append({
@@ -110,52 +147,81 @@ class QualityAssuranceAgent:
                 "severity": "high" if len(missing_sections) > 2 else "moderate"
             })
         
+        # With every section empty the remaining checks have a fixed outcome
+        if len(missing_sections) == len(required_sections):
+            issues.extend((
+                self._insufficient_recommendations_issue(0),
+                self._missing_vitals_issue(list(_REQUIRED_VITALS)),
+                self._incomplete_followup_issue()
+            ))
+            return {
+                "score": 0.0,
+                "issues": issues,
+                "details": {
+                    "sections_checked": missing_sections[:],
+                    "sections_missing": missing_sections,
+                    "vitals_missing": list(_REQUIRED_VITALS)
+                }
+            }
+        
         # Check minimum recommendations
-        treatment_plan = treatment_recommendations.get("treatment_plan", {})
+        treatment_plan = treatment_recommendations.get("treatment_plan") or {}
         primary_recs = treatment_plan.get("primary_recommendations", [])
         if len(primary_recs) < 3:
-            issues.append({
-                "type": "insufficient_recommendations",
-                "description": f"Only {len(primary_recs)} primary treatment recommendations provided (minimum 3)",
-                "severity": "moderate" if len(primary_recs) < 2 else "low"
-            })
+            issues.append(self._insufficient_recommendations_issue(len(primary_recs)))
             score -= 0.1 * (3 - len(primary_recs))
         
         # Check required vitals
-        vitals = patient_data.get("vitals", {})
-        missing_vitals = []
-        for vital in self.quality_criteria["completeness"]["required_vitals"]:
-            if vital not in vitals or not vitals[vital]:
-                missing_vitals.append(vital)
+        vitals = patient_data.get("vitals") or {}
+        missing_vitals = [vital for vital in _REQUIRED_VITALS if not vitals.get(vital)]
         
         if missing_vitals:
-            issues.append({
-                "type": "missing_vitals",
-                "description": f"Missing vital signs: {', '.join(missing_vitals)}",
-                "severity": "moderate" if len(missing_vitals) > 1 else "low"
-            })
+            issues.append(self._missing_vitals_issue(missing_vitals))
             score -= 0.05 * len(missing_vitals)
         
         # Check follow-up plan completeness
-        followup_schedule = followup_plan.get("followup_schedule", {})
+        followup_schedule = followup_plan.get("followup_schedule") or {}
         if not followup_schedule.get("immediate_followup") and not followup_schedule.get("short_term_followup"):
-            issues.append({
-                "type": "incomplete_followup",
-                "description": "Follow-up plan lacks immediate or short-term components",
-                "severity": "moderate"
-            })
+            issues.append(self._incomplete_followup_issue())
             score -= 0.1
         
         return {
             "score": max(0.0, round(score, 2)),
             "issues": issues,
             "details": {
-                "sections_checked": list(required_sections.keys()),
+                "sections_checked": [section_name for section_name, _ in required_sections],
                 "sections_missing": missing_sections,
                 "vitals_missing": missing_vitals
             }
         }
 
+    @staticmethod
+    def _insufficient_recommendations_issue(recommendation_count: int) -> dict:
+        """Issue for a treatment plan below the minimum number of primary recommendations."""
+        return {
+            "type": "insufficient_recommendations",
+            "description": f"Only {recommendation_count} primary treatment recommendations provided (minimum 3)",
+            "severity": "moderate" if recommendation_count < 2 else "low"
+        }
+
+    @staticmethod
+    def _missing_vitals_issue(missing_vitals: List[str]) -> dict:
+        """Issue for required vital signs that were not recorded."""
+        return {
+            "type": "missing_vitals",
+            "description": f"Missing vital signs: {', '.join(missing_vitals)}",
+            "severity": "moderate" if len(missing_vitals) > 1 else "low"
+        }
+
+    @staticmethod
+    def _incomplete_followup_issue() -> dict:
+        """Issue for a follow-up plan without immediate or short-term components."""
+        return {
+            "type": "incomplete_followup",
+            "description": "Follow-up plan lacks immediate or short-term components",
+            "severity": "moderate"
+        }
+
     def _check_consistency(self, symptoms_analysis: dict, risk_assessment: dict,
                           treatment_recommendations: dict, followup_plan: dict,
                           specialist_recommendations: dict) -> dict:
@@ -177,7 +243,7 @@ class QualityAssuranceAgent:
             score -= 0.2
         
         # Check treatment alignment
-        treatment_plan = treatment_recommendations.get("treatment_plan", {})
+        treatment_plan = treatment_recommendations.get("treatment_plan") or {}
         diagnosed_conditions = self._extract_conditions_from_analysis(symptoms_analysis)
         recommended_treatments = self._extract_treatments_from_plan(treatment_plan)
         
@@ -192,7 +258,7 @@ class QualityAssuranceAgent:
         
         # Check follow-up alignment
         complexity_level = specialist_recommendations.get("complexity_level", "low_complexity")
-        followup_schedule = followup_plan.get("followup_schedule", {})
+        followup_schedule = followup_plan.get("followup_schedule") or {}
         
         # High complexity should have more intensive follow-up
         if complexity_level == "high_complexity" and not followup_schedule.get("immediate_followup"):
@@ -218,13 +284,13 @@ class QualityAssuranceAgent:
         """Check safety of all recommendations."""
         issues = []
         score = 1.0
-        
-        # Check for critical findings that require immediate attention
         symptoms = patient_data.get("symptoms", "")
-        vitals = patient_data.get("vitals", {})
+        vitals = patient_data.get("vitals") or {}
+        safety_assessment = drug_interactions.get("safety_assessment") or {}
+        treatment_plan = treatment_recommendations.get("treatment_plan") or {}
         
-        critical_symptoms = ["chest pain", "shortness of breath", "loss of consciousness"]
-        has_critical_symptoms = any(symptom in symptoms.lower() for symptom in critical_symptoms)
+        # Check for critical findings that require immediate attention
+        has_critical_symptoms = _CRITICAL_SYMPTOMS_RE.search(symptoms.lower()) is not None
         
         has_critical_vitals = self._has_critical_vitals(vitals)
         
@@ -237,7 +303,6 @@ class QualityAssuranceAgent:
             score -= 0.3
         
         # Check for contraindications
-        safety_assessment = drug_interactions.get("safety_assessment", {})
         major_contraindications = safety_assessment.get("major_contraindications", [])
         high_risk_interactions = safety_assessment.get("high_risk_interactions", [])
         
@@ -258,7 +323,6 @@ class QualityAssuranceAgent:
             score -= 0.2 * len(high_risk_interactions)
         
         # Check treatment safety
-        treatment_plan = treatment_recommendations.get("treatment_plan", {})
         contraindications_checked = treatment_plan.get("contraindications_checked", [])
         
         if not contraindications_checked:
@@ -288,28 +352,16 @@ class QualityAssuranceAgent:
         if not concerns:
             return 0.1
             
-        critical_concerns = ["chest pain", "shortness of breath", "loss of consciousness"]
-        has_critical = any(concern.get("name", "").lower() in critical_concerns for concern in concerns)
-        
-        if has_critical:
-            return 0.9
-        elif len(concerns) > 2:
-            return 0.7
-        elif len(concerns) > 0:
-            return 0.4
-        else:
-            return 0.1
+        has_critical = not _CRITICAL_CONCERNS.isdisjoint(
+            concern.get("name", "").lower() for concern in concerns
+        )
+        n = len(concerns)
+        return _SEVERITY_TABLE[(has_critical << 2) | ((n > 2) << 1) | (n > 0)]
 
     def _extract_conditions_from_analysis(self, symptoms_analysis: dict) -> List[str]:
         """Extract diagnosed conditions from symptoms analysis."""
-        conditions = []
         symptom_categories = symptoms_analysis.get("symptom_categories", {})
-        
-        for category, symptoms in symptom_categories.items():
-            if symptoms:
-                conditions.append(category)
-                
-        return conditions
+        return [category for category, symptoms in symptom_categories.items() if symptoms]
 
     def _extract_treatments_from_plan(self, treatment_plan: dict) -> List[str]:
         """Extract treatments from treatment plan."""
@@ -320,29 +372,21 @@ class QualityAssuranceAgent:
         # Simplified extraction - in a real system, this would be more sophisticated
         all_recs = primary_recs + secondary_recs
         for rec in all_recs:
-            if "aspirin" in rec.lower():
-                treatments.append("aspirin")
-            elif "nitroglycerin" in rec.lower():
-                treatments.append("nitroglycerin")
-            elif "oxygen" in rec.lower():
-                treatments.append("oxygen")
-            elif "antibiotic" in rec.lower() or "antibiotic" in rec.lower():
-                treatments.append("antibiotics")
+            rec_lower = rec.lower()
+            for keyword, treatment in _TREATMENT_KEYWORDS:
+                if keyword in rec_lower:
+                    treatments.append(treatment)
+                    break
                 
         return treatments
 
     def _treatments_match_conditions(self, conditions: List[str], treatments: List[str]) -> bool:
         """Check if treatments match diagnosed conditions."""
         # Simplified matching logic
-        condition_treatment_map = {
-            "cardiovascular": ["aspirin", "nitroglycerin"],
-            "respiratory": ["oxygen"],
-            "infectious": ["antibiotics"]
-        }
-        
+        treatment_set = set(treatments)
         for condition in conditions:
-            expected_treatments = condition_treatment_map.get(condition, [])
-            if expected_treatments and not any(t in treatments for t in expected_treatments):
+            expected_treatments = _CONDITION_TREATMENTS.get(condition)
+            if expected_treatments and expected_treatments.isdisjoint(treatment_set):
                 return False
                 
         return True
@@ -373,45 +417,36 @@ class QualityAssuranceAgent:
         blood_pressure = vitals.get("blood_pressure")
         if blood_pressure is not None:
             try:
-                bp_parts = blood_pressure.split("/")
-                if len(bp_parts) == 2:
-                    systolic = int(bp_parts[0])
-                    diastolic = int(bp_parts[1])
-                    if systolic > 180 or diastolic > 120 or systolic < 80:
-                        return True
-            except (ValueError, TypeError):
-                pass
+                match = _BP_RE.match(blood_pressure)
+            except TypeError:
+                match = None
+            if match:
+                systolic, diastolic = int(match.group(1)), int(match.group(2))
+                if systolic > 180 or diastolic > 120 or systolic < 80:
+                    return True
         
         return False
 
     def _calculate_overall_quality_score(self, completeness_check: dict, 
                                         consistency_check: dict, safety_check: dict) -> float:
         """Calculate overall quality score based on individual scores and weights."""
-        completeness_score = completeness_check["score"]
-        consistency_score = consistency_check["score"]
-        safety_score = safety_check["score"]
-        
-        overall_score = (
-            completeness_score * self.quality_weights["completeness"] +
-            consistency_score * self.quality_weights["consistency"] +
-            safety_score * self.quality_weights["safety"]
+        return round(
+            completeness_check["score"] * _SCORE_WEIGHTS[0] +
+            consistency_check["score"] * _SCORE_WEIGHTS[1] +
+            safety_check["score"] * _SCORE_WEIGHTS[2],
+            2
         )
-        
-        return round(overall_score, 2)
 
     def _generate_qa_report(self, completeness_check: dict, consistency_check: dict, 
                            safety_check: dict, quality_score: float) -> dict:
         """Generate comprehensive quality assurance report."""
         # Collect all issues
-        all_issues = []
-        all_issues.extend(completeness_check["issues"])
-        all_issues.extend(consistency_check["issues"])
-        all_issues.extend(safety_check["issues"])
+        all_issues = list(chain(
+            completeness_check["issues"], consistency_check["issues"], safety_check["issues"]
+        ))
         
-        # Categorize issues by severity
-        high_severity_issues = [issue for issue in all_issues if issue["severity"] == "high"]
-        moderate_severity_issues = [issue for issue in all_issues if issue["severity"] == "moderate"]
-        low_severity_issues = [issue for issue in all_issues if issue["severity"] == "low"]
+        # Count issues by severity
+        severity_counts = Counter(issue["severity"] for issue in all_issues)
         
         # Generate overall assessment
         if quality_score >= 0.8:
@@ -438,9 +473,9 @@ class QualityAssuranceAgent:
                 },
                 "issues_summary": {
                     "total_issues": len(all_issues),
-                    "high_severity": len(high_severity_issues),
-                    "moderate_severity": len(moderate_severity_issues),
-                    "low_severity": len(low_severity_issues)
+                    "high_severity": severity_counts["high"],
+                    "moderate_severity": severity_counts["moderate"],
+                    "low_severity": severity_counts["low"]
                 },
                 "detailed_issues": all_issues,
                 "improvement_suggestions": improvement_suggestions
@@ -453,34 +488,35 @@ class QualityAssuranceAgent:
         """Generate improvement suggestions based on identified issues."""
         suggestions = []
         
+        completeness_types = {issue["type"] for issue in completeness_check["issues"]}
+        consistency_types = {issue["type"] for issue in consistency_check["issues"]}
+        safety_types = {issue["type"] for issue in safety_check["issues"]}
+        
         # Completeness suggestions
-        completeness_issues = completeness_check["issues"]
-        if any(issue["type"] == "missing_sections" for issue in completeness_issues):
+        if "missing_sections" in completeness_types:
             suggestions.append("Ensure all required sections are completed before finalizing recommendations")
         
-        if any(issue["type"] == "insufficient_recommendations" for issue in completeness_issues):
+        if "insufficient_recommendations" in completeness_types:
             suggestions.append("Add more specific treatment recommendations based on diagnosed conditions")
         
-        if any(issue["type"] == "missing_vitals" for issue in completeness_issues):
+        if "missing_vitals" in completeness_types:
             suggestions.append("Collect all required vital signs for comprehensive assessment")
         
         # Consistency suggestions
-        consistency_issues = consistency_check["issues"]
-        if any(issue["type"] == "risk_symptom_mismatch" for issue in consistency_issues):
+        if "risk_symptom_mismatch" in consistency_types:
             suggestions.append("Reassess risk score to ensure alignment with symptom severity")
         
-        if any(issue["type"] == "treatment_condition_mismatch" for issue in consistency_issues):
+        if "treatment_condition_mismatch" in consistency_types:
             suggestions.append("Review treatment recommendations to ensure they match diagnosed conditions")
         
         # Safety suggestions
-        safety_issues = safety_check["issues"]
-        if any(issue["type"] == "under_triage" for issue in safety_issues):
+        if "under_triage" in safety_types:
             suggestions.append("Reassess patient urgency level given critical symptoms or vitals")
         
-        if any(issue["type"] == "major_contraindications" for issue in safety_issues):
+        if "major_contraindications" in safety_types:
             suggestions.append("Review and address all identified contraindications before implementation")
         
-        if any(issue["type"] == "high_risk_interactions" for issue in safety_issues):
+        if "high_risk_interactions" in safety_types:
             suggestions.append("Consult with clinical pharmacist to resolve high-risk drug interactions")
         
         # General suggestions if no specific issues
@@ -2,12 +2,157 @@ import chromadb
 from app.core.config import settings
 from app.core.embedding import EmbeddingModel
 from typing import Any, List, Dict, Optional
-import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+import copy
+import heapq
 import json
 import os
+import threading
+import time
 from app.utils.medical_apis import search_medline, get_cdc_data, get_who_data, search_serper
 from app.core.agent_memory import get_agent_memory
 
+_client = None
+_collection = None
+_collection_lock = threading.Lock()
+
+
+def _get_collection():
+    """
+    Return the process-wide clinical guidelines collection.
+    The client is opened, and an empty collection seeded, only on first use.
+    """
+    global _client, _collection
+    if _collection is None:
+        with _collection_lock:
+            if _collection is None:
+                client = chromadb.PersistentClient(path=settings.CHROMA_DB_PATH)
+                collection = client.get_or_create_collection(
+                    name="clinical_guidelines",
+                )
+                # Initialize database if empty
+                if collection.count() == 0:
+                    _load_default_guidelines(collection)
+                _client = client
+                _collection = collection
+    return _collection
+
+
+def warmup_knowledge_base():
+    """
+    Open the collection and run one throwaway query so Chroma loads its embedder
+    before the first real request instead of during it. Stored guidelines are
+    tokenized up front so relevance scoring starts from a warm token cache.
+    """
+    try:
+        collection = _get_collection()
+        if collection.count() > 0:
+            collection.query(query_texts=["warmup"], n_results=1)
+            stored = collection.get(limit=_document_tokens.cache_info().maxsize, include=["documents"])
+            _prime_document_tokens(stored.get("documents") or [])
+    except Exception as e:
+        print(f"Warning: RAG warmup failed: {e}")
+
+
+# Documents per collection.add call; keeps each embedding/SQLite write batch bounded
+_ADD_BATCH_SIZE = 128
+
+
+def _add_in_batches(collection, documents: list, metadatas: list, ids: list):
+    """Add documents to a collection in fixed-size batches."""
+    for start in range(0, len(ids), _ADD_BATCH_SIZE):
+        end = start + _ADD_BATCH_SIZE
+        collection.add(
+            documents=documents[start:end],
+            metadatas=metadatas[start:end],
+            ids=ids[start:end]
+        )
+    _prime_document_tokens(documents)
+
+
+def _prime_document_tokens(documents: list):
+    """Tokenize guidelines once at load time instead of on their first retrieval."""
+    for document in documents:
+        if isinstance(document, str):
+            _document_tokens(document)
+
+
+def _load_default_guidelines(collection):
+    """Load default clinical guidelines into the given collection."""
+    guidelines_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'clinical_guidelines.json')
+    
+    if not os.path.exists(guidelines_path):
+        print(f"Warning: Clinical guidelines file not found at {guidelines_path}")
+        return
+    
+    try:
+        with open(guidelines_path, 'r') as f:
+            guidelines = json.load(f)
+        
+        # Prepare documents for ChromaDB
+        documents = []
+        metadatas = []
+        ids = []
+        
+        for guideline in guidelines:
+            documents.append(guideline['content'])
+            metadatas.append({
+                'title': guideline['title'],
+                'category': guideline['category'],
+                'keywords': ', '.join(guideline['keywords'])
+            })
+            ids.append(guideline['id'])
+        
+        # Add documents to collection
+        _add_in_batches(collection, documents, metadatas, ids)
+        
+        print(f"Initialized RAG database with {len(guidelines)} clinical guidelines.")
+    except Exception as e:
+        print(f"Error loading clinical guidelines: {e}")
+
+
+# Shared pool for the blocking external-source lookups of a query
+_external_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="rag-external")
+
+
+# Terms that boost relevance when they appear in the query
+_MEDICAL_TERMS = frozenset([
+    "treatment", "diagnosis", "management", "protocol", "guideline",
+    "clinical", "medical", "patient", "symptom", "condition",
+    "therapy", "intervention", "assessment", "evaluation"
+])
+_SYMPTOM_TERMS = frozenset([
+    "pain", "fever", "cough", "breath", "nausea", "vomit",
+    "headache", "dizzy", "fatigue", "weak", "swell", "rash",
+    "itch", "burn", "numb", "tingle", "cramp", "spasm"
+])
+
+
+# External sources ranked ahead of web search results
+_HIGH_PRIORITY_SOURCES = frozenset({"MEDLINE/PubMed", "CDC", "WHO"})
+
+_RELEVANCE_KEY = itemgetter("relevance_score")
+
+# Guideline sources that contribute a single entry when data is available:
+# (external_data key, source, relevance, type, evidence level, content, title)
+_GUIDELINE_SOURCES = (
+    ("cdc", "CDC", 0.90, "public_health", "High - Government public health authority",
+     "Public health guidelines from CDC for {query}. These guidelines represent evidence-based public health recommendations for diagnosis, treatment, and prevention.",
+     "CDC Public Health Guidelines for {query}"),
+    ("who", "WHO", 0.85, "international_guidelines", "High - International health authority",
+     "International health guidelines from WHO for {query}. These guidelines represent global standards for healthcare practices and disease management.",
+     "WHO International Health Standards for {query}"),
+)
+
+
+@lru_cache(maxsize=1024)
+def _document_tokens(document: str) -> frozenset:
+    """Lowercased word set of a document; the same top guidelines come back for many queries."""
+    return frozenset(document.lower().split())
+
 class KnowledgeRAGAgent:
     """
     Agent for retrieving information from a clinical knowledge base using RAG.
@@ -16,66 +161,38 @@ class KnowledgeRAGAgent:
     Prioritizes symptom-based queries for external data retrieval.
     """
     def __init__(self):
-        self.client = chromadb.PersistentClient(path=settings.CHROMA_DB_PATH)
-        self.embedding_function = EmbeddingModel.get_instance()
-        self.collection = self.client.get_or_create_collection(
-            name="clinical_guidelines",
-        )
+        # Opening the client and seeding the collection happen once per process
+        self.collection = _get_collection()
+        self.client = _client
         self.memory = get_agent_memory()
-        # Initialize database if empty
-        self._initialize_database_if_empty()
 
-    def _initialize_database_if_empty(self):
-        """Initialize the database with clinical guidelines if it's empty."""
+    @property
+    def embedding_function(self):
+        """Shared embedding model, loaded on first access."""
+        return EmbeddingModel.get_instance()
+
+    def ensure_seeded(self):
+        """Load the default clinical guidelines if the collection is empty."""
         if self.collection.count() == 0:
             self._load_default_guidelines()
 
     def _load_default_guidelines(self):
         """Load default clinical guidelines into the database."""
-        guidelines_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'clinical_guidelines.json')
-        
-        if not os.path.exists(guidelines_path):
-            print(f"Warning: Clinical guidelines file not found at {guidelines_path}")
-            return
-        
-        try:
-            with open(guidelines_path, 'r') as f:
-                guidelines = json.load(f)
-            
-            # Prepare documents for ChromaDB
-            documents = []
-            metadatas = []
-            ids = []
-            
-            for guideline in guidelines:
-                documents.append(guideline['content'])
-                metadatas.append({
-                    'title': guideline['title'],
-                    'category': guideline['category'],
-                    'keywords': ', '.join(guideline['keywords'])
-                })
-                ids.append(guideline['id'])
-            
-            # Add documents to collection
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
-            
-            print(f"Initialized RAG database with {len(guidelines)} clinical guidelines.")
-        except Exception as e:
-            print(f"Error loading clinical guidelines: {e}")
+        _load_default_guidelines(self.collection)
+        self.reset_cache()
 
     def init_db(self, documents: list, metadatas: list, ids: list):
         """
         Initializes the ChromaDB with a set of documents.
         """
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        _add_in_batches(self.collection, documents, metadatas, ids)
+        # Cached answers were ranked against the old collection contents
+        self.reset_cache()
+
+    @staticmethod
+    def reset_cache():
+        """Drop all cached query results."""
+        _query_cache.clear()
 
     def run(self, query: str, n_results: int = 5) -> list:
         """
@@ -83,27 +200,58 @@ class KnowledgeRAGAgent:
         Enhanced with external data integration and sophisticated ranking.
         Prioritizes symptom-based information retrieval.
         """
-        # First, try to get external data with enhanced symptom-focused queries
-        external_data = self._get_external_data(query)
+        # Repeat queries skip the external lookups, embedding and re-ranking; each
+        # caller gets its own copy so edits never reach the shared cache entry
+        enhanced_results = copy.deepcopy(list(_cached_query(query, n_results)))
+        
+        # Store results in shared memory
+        self.memory.store_agent_output("rag", {
+            "query": query,
+            "results": enhanced_results
+        })
+        
+        return enhanced_results
+
+    def run_batch(self, queries: List[str], n_results: int = 5) -> List[list]:
+        """
+        Queries the knowledge base for several related queries with a single collection lookup.
+        Returns one result list per query, ranked the same way as run().
+        The batch is stored under "rag_batch" so the single-query "rag" entry keeps its shape.
+        """
+        if not queries:
+            return []
         
-        # Then query the local knowledge base
         results = self.collection.query(
-            query_texts=[query],
+            query_texts=list(queries),
             n_results=n_results
         )
         
-        # Enhance results with relevance scoring and filtering
-        enhanced_results = self._enhance_results(results, query, external_data)
+        documents = results.get('documents') or []
+        metadatas = results.get('metadatas') or []
+        distances = results.get('distances') or []
+        
+        batch_results = []
+        for i, query in enumerate(queries):
+            # Slice this query's row back into the single-query result shape
+            query_results = {
+                'documents': documents[i:i + 1],
+                'metadatas': metadatas[i:i + 1],
+                'distances': distances[i:i + 1]
+            }
+            # With external APIs disabled there is nothing for _enhance_results to merge
+            external_data = self._get_external_data(query) if settings.ENABLE_EXTERNAL_APIS else None
+            batch_results.append(self._enhance_results(query_results, query, external_data))
         
         # Store results in shared memory
-        self.memory.store_agent_output("rag", {
-            "query": query,
-            "results": enhanced_results
+        self.memory.store_agent_output("rag_batch", {
+            "queries": list(queries),
+            "results": batch_results
         })
         
-        return enhanced_results
+        return batch_results
 
-    def _get_external_data(self, query: str) -> dict:
+    @classmethod
+    def _get_external_data(cls, query: str) -> dict:
         """
         Retrieve data from external medical sources with fallback.
         Enhanced to prioritize symptom-based queries.
@@ -117,7 +265,7 @@ class KnowledgeRAGAgent:
             }
         
         # Extract key symptoms from query for more targeted searches
-        key_symptoms = self._extract_key_symptoms(query)
+        key_symptoms = cls._extract_key_symptoms(query)
         
         # Use both original query and symptom-focused queries
         search_queries = [query]
@@ -132,12 +280,19 @@ class KnowledgeRAGAgent:
         who_results = []
         serper_results = []
         
-        for search_query in search_queries:
-            # Get data from external APIs
-            medline_data = search_medline(search_query)
-            cdc_data = get_cdc_data(search_query)
-            who_data = get_who_data(search_query)
-            serper_data = search_serper(search_query)
+        # Every source is requested for every query concurrently; results are
+        # consumed in query order so the last successful one still wins
+        pending = [
+            [_external_executor.submit(fetch, search_query)
+             for fetch in (search_medline, get_cdc_data, get_who_data, search_serper)]
+            for search_query in search_queries
+        ]
+        
+        for medline_future, cdc_future, who_future, serper_future in pending:
+            medline_data = medline_future.result()
+            cdc_data = cdc_future.result()
+            who_data = who_future.result()
+            serper_data = serper_future.result()
             
             # Collect successful results
             if medline_data.get("status") == "success":
@@ -159,7 +314,8 @@ class KnowledgeRAGAgent:
         
         return external_data
 
-    def _extract_key_symptoms(self, query: str) -> List[str]:
+    @staticmethod
+    def _extract_key_symptoms(query: str) -> List[str]:
         """
         Extract key symptoms from a query to create more targeted searches.
         """
@@ -191,7 +347,8 @@ class KnowledgeRAGAgent:
         
         return symptoms
 
-    def _enhance_results(self, results: Any, query: str, external_data: Optional[dict] = None) -> List[Dict]:
+    @classmethod
+    def _enhance_results(cls, results: Any, query: str, external_data: Optional[dict] = None) -> List[Dict]:
         """
         Enhance and filter results based on relevance and quality.
         Integrates external data when available with priority ranking.
@@ -214,31 +371,19 @@ class KnowledgeRAGAgent:
                         "evidence_level": "High - Peer-reviewed research"
                     })
             
-            # Add CDC data if successful
-            cdc_data = external_data.get("cdc", {})
-            if cdc_data.get("status") == "success" and cdc_data.get("data_available"):
-                enhanced_docs.append({
-                    "content": f"Public health guidelines from CDC for {query}. These guidelines represent evidence-based public health recommendations for diagnosis, treatment, and prevention.",
-                    "relevance_score": 0.90,
-                    "source": "CDC",
-                    "title": f"CDC Public Health Guidelines for {query}",
-                    "external": True,
-                    "type": "public_health",
-                    "evidence_level": "High - Government public health authority"
-                })
-            
-            # Add WHO data if successful
-            who_data = external_data.get("who", {})
-            if who_data.get("status") == "success" and who_data.get("data_available"):
-                enhanced_docs.append({
-                    "content": f"International health guidelines from WHO for {query}. These guidelines represent global standards for healthcare practices and disease management.",
-                    "relevance_score": 0.85,
-                    "source": "WHO",
-                    "title": f"WHO International Health Standards for {query}",
-                    "external": True,
-                    "type": "international_guidelines",
-                    "evidence_level": "High - International health authority"
-                })
+            # Add CDC and WHO guidelines if successful
+            for key, source, relevance, doc_type, evidence_level, content, title in _GUIDELINE_SOURCES:
+                source_data = external_data.get(key, {})
+                if source_data.get("status") == "success" and source_data.get("data_available"):
+                    enhanced_docs.append({
+                        "content": content.format(query=query),
+                        "relevance_score": relevance,
+                        "source": source,
+                        "title": title.format(query=query),
+                        "external": True,
+                        "type": doc_type,
+                        "evidence_level": evidence_level
+                    })
             
             # Add Serper data if successful
             serper_data = external_data.get("serper", {})
@@ -264,43 +409,42 @@ class KnowledgeRAGAgent:
             metadatas = results['metadatas'][0] if 'metadatas' in results and results['metadatas'] else [{}] * len(documents)
             distances = results['distances'][0] if 'distances' in results and results['distances'] else [0.0] * len(documents)
             
-            # Filter out low-quality results
-            for i, doc in enumerate(documents):
-                # Skip empty or very short documents
-                if len(doc.strip()) < 10:
-                    continue
-                    
-                # Calculate relevance score with enhanced symptom matching
-                relevance_score = self._calculate_relevance(query, doc)
-                
-                # Skip documents with very low relevance
-                if relevance_score < 0.05:
-                    continue
-                
-                # Format document content
-                formatted_content = self._format_document_content(doc)
+            query_words = frozenset(query.lower().split())
+            relevance_scores = cls._score_documents(query_words, documents)
+            
+            # Filter out low-quality results: empty or very short documents, then
+            # documents with very low relevance
+            kept = [
+                i for i, doc in enumerate(documents)
+                if len(doc.strip()) >= 10 and relevance_scores[i] >= 0.05
+            ]
+            
+            metadata_count = len(metadatas)
+            for i in kept:
+                metadata = metadatas[i] if i < metadata_count else {}
                 
                 # Add document with metadata
                 enhanced_docs.append({
-                    "content": formatted_content,
-                    "relevance_score": round(relevance_score, 3),
+                    "content": cls._format_document_content(documents[i]),
+                    "relevance_score": round(relevance_scores[i], 3),
                     "distance": round(distances[i], 3) if distances else None,
-                    "metadata": metadatas[i] if i < len(metadatas) else {},
-                    "title": metadatas[i].get('title', 'Clinical Guideline') if i < len(metadatas) else 'Clinical Guideline',
+                    "metadata": metadata,
+                    "title": metadata.get('title', 'Clinical Guideline'),
                     "source": "Local Clinical Guidelines",
                     "external": False,
                     "type": "clinical_guideline",
                     "evidence_level": "Moderate - Institutional guidelines",
-                    "category": metadatas[i].get('category', 'general') if i < len(metadatas) else 'general'
+                    "category": metadata.get('category', 'general')
                 })
         
-        # Sort by relevance score
-        enhanced_docs.sort(key=lambda x: x["relevance_score"], reverse=True)
+        # Keep the ten most relevant; ties stay in insertion order as with a stable sort
+        top_docs = heapq.nlargest(10, enhanced_docs, key=_RELEVANCE_KEY)
         
         # Return top documents with enhanced categorization
-        return self._categorize_and_prioritize_results(enhanced_docs[:10])
+        return cls._categorize_and_prioritize_results(top_docs)
 
-    def _categorize_and_prioritize_results(self, results: List[Dict]) -> List[Dict]:
+    @staticmethod
+    def _categorize_and_prioritize_results(results: List[Dict]) -> List[Dict]:
         """
         Further categorize and prioritize results based on clinical relevance.
         """
@@ -309,74 +453,147 @@ class KnowledgeRAGAgent:
         local_results = [r for r in results if not r.get("external", False)]
         
         # Prioritize by evidence level and source type
-        prioritized_results = []
-        
         # Add high-priority external sources first
-        for result in external_results:
-            if result.get("source") in ["MEDLINE/PubMed", "CDC", "WHO"]:
-                prioritized_results.append(result)
+        prioritized_results = [r for r in external_results if r.get("source") in _HIGH_PRIORITY_SOURCES]
         
         # Add Serper results
-        for result in external_results:
-            if result.get("source") == "Serper/Google Search":
-                prioritized_results.append(result)
+        prioritized_results.extend(r for r in external_results if r.get("source") == "Serper/Google Search")
         
         # Add local clinical guidelines
-        for result in local_results:
-            prioritized_results.append(result)
+        prioritized_results.extend(local_results)
         
         # Add any remaining results
-        for result in results:
-            if result not in prioritized_results:
-                prioritized_results.append(result)
+        placed = set(map(id, prioritized_results))
+        prioritized_results.extend(r for r in results if id(r) not in placed)
         
         return prioritized_results[:10]  # Return top 10 most relevant results to include external sources
 
-    def _calculate_relevance(self, query: str, document: str) -> float:
+    @classmethod
+    def _calculate_relevance(cls, query: str, document: str) -> float:
         """
         Calculate a relevance score between query and document.
         Enhanced with medical terminology matching and symptom prioritization.
         """
-        query_words = set(query.lower().split())
-        doc_words = set(document.lower().split())
-        
+        return cls._relevance(frozenset(query.lower().split()), document)
+
+    @classmethod
+    def _relevance(cls, query_words: frozenset, document: str) -> float:
+        """
+        Relevance of a document against an already tokenized query.
+        """
+        return cls._score_documents(query_words, (document,))[0]
+
+    @staticmethod
+    def _score_documents(query_words: frozenset, documents: List[str]) -> List[float]:
+        """
+        Score a batch of retrieved documents against an already tokenized query.
+        The query-only boosts are computed once for the whole batch.
+        """
         if not query_words:
-            return 0.0
-            
-        # Calculate Jaccard similarity
-        intersection = query_words.intersection(doc_words)
-        union = query_words.union(doc_words)
-        
-        if len(union) == 0:
-            return 0.0
-            
-        base_similarity = len(intersection) / len(union)
+            return [0.0] * len(documents)
         
         # Boost score for medical terminology matches
-        medical_terms = ["treatment", "diagnosis", "management", "protocol", "guideline", 
-                        "clinical", "medical", "patient", "symptom", "condition", 
-                        "therapy", "intervention", "assessment", "evaluation"]
-        medical_matches = len(query_words.intersection(set(medical_terms)))
+        medical_matches = len(query_words & _MEDICAL_TERMS)
         medical_boost = medical_matches * 0.15  # Increased boost for medical terms
         
         # Additional boost for symptom-related terms
-        symptom_terms = ["pain", "fever", "cough", "breath", "nausea", "vomit",
-                        "headache", "dizzy", "fatigue", "weak", "swell", "rash",
-                        "itch", "burn", "numb", "tingle", "cramp", "spasm"]
-        symptom_matches = len(query_words.intersection(set(symptom_terms)))
+        symptom_matches = len(query_words & _SYMPTOM_TERMS)
         symptom_boost = symptom_matches * 0.2  # Higher boost for symptom terms
         
-        return min(1.0, base_similarity + medical_boost + symptom_boost)
+        query_size = len(query_words)
+        scores = []
+        for document in documents:
+            doc_words = _document_tokens(document)
+            # Calculate Jaccard similarity; the union size follows from the intersection
+            intersection = len(query_words & doc_words)
+            base_similarity = intersection / (query_size + len(doc_words) - intersection)
+            scores.append(min(1.0, base_similarity + medical_boost + symptom_boost))
+        return scores
 
-    def _format_document_content(self, content: str) -> str:
+    @staticmethod
+    def _format_document_content(content: str) -> str:
         """
         Format document content for better readability.
         """
-        # Remove excessive whitespace
-        content = re.sub(r'\s+', ' ', content.strip())
+        # Remove excessive whitespace; split() drops leading/trailing runs like strip()
+        words = content.split()
         
-        # Limit length for display but preserve more content for detailed analysis
-        if len(content) > 800:
-            content = content[:800] + "..."
+        # Limit length for display but preserve more content for detailed analysis;
+        # only the words that reach into the first 800 characters are joined
+        length = -1
+        for count, word in enumerate(words, 1):
+            length += len(word) + 1
+            if length > 800:
+                return " ".join(words[:count])[:800] + "..."
             
-        return content
\ No newline at end of file
+        return " ".join(words)
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache whose entries expire after a fixed time-to-live.
+    Used to share ranked RAG results across agent instances.
+    """
+    def __init__(self, max_size: int = 256, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: Any) -> Any:
+        """Return the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Entries expire so refreshed external sources are picked up.
+# Call KnowledgeRAGAgent.reset_cache() whenever the collection changes.
+_query_cache = QueryCache(max_size=256, ttl=300.0)
+
+
+def _cached_query(query: str, n_results: int) -> tuple:
+    """
+    Retrieve and rank documents for a query; results are shared across agents.
+    The returned tuple and its dicts are the cached objects themselves and must
+    not be mutated; copy them before handing them to callers.
+    """
+    key = (query, n_results)
+    cached = _query_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    # First, try to get external data with enhanced symptom-focused queries;
+    # when external APIs are disabled the merge step is skipped entirely
+    external_data = KnowledgeRAGAgent._get_external_data(query) if settings.ENABLE_EXTERNAL_APIS else None
+
+    # Then query the local knowledge base
+    results = _get_collection().query(
+        query_texts=[query],
+        n_results=n_results
+    )
+
+    # Enhance results with relevance scoring and filtering
+    enhanced_results = tuple(KnowledgeRAGAgent._enhance_results(results, query, external_data))
+    _query_cache.put(key, enhanced_results)
+    return enhanced_results
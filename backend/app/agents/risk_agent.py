@@ -1,6 +1,130 @@
+import math
 import re
+from bisect import bisect_right
 from app.core.agent_memory import get_agent_memory
 
+# Critical symptoms (high risk) and their risk contribution
+_CRITICAL_SYMPTOMS = (
+    ("chest pain", 0.9),
+    ("shortness of breath", 0.85),
+    ("loss of consciousness", 0.95),
+    ("severe headache", 0.7),
+    ("difficulty breathing", 0.9),
+    ("severe dizziness", 0.75),
+    ("persistent vomiting", 0.6),
+    ("high fever", 0.7),
+    ("severe abdominal pain", 0.7)
+)
+
+# Moderate symptoms and their risk contribution
+_MODERATE_SYMPTOMS = (
+    ("fatigue", 0.3),
+    ("mild fever", 0.4),
+    ("nausea", 0.35),
+    ("dizziness", 0.4),
+    ("cough", 0.2),
+    ("sore throat", 0.15)
+)
+
+# One scan finds every known symptom; the lookahead keeps overlapping
+# occurrences, so each phrase is reported exactly as a substring test would
+_SYMPTOM_RE = re.compile(
+    "(?=(" + "|".join(re.escape(symptom) for symptom, _ in _CRITICAL_SYMPTOMS + _MODERATE_SYMPTOMS) + "))"
+)
+
+# Threshold ladders as step tables: bisect_right picks the band and the
+# parallel tuples give its risk and the critical finding it raises, if any.
+# A strict "> t" bound starts its band at the next float above t.
+_HR_BREAKS = (50, 60, 101, 121, 131)
+_HR_RISKS = (0.8, 0.3, 0.0, 0.4, 0.7, 0.9)
+_HR_CRITICAL = ("Severe bradycardia", None, None, None, None, "Severe tachycardia")
+
+_TEMP_BREAKS = (35.0, 36.0, math.nextafter(38.0, math.inf), math.nextafter(39.0, math.inf), math.nextafter(39.5, math.inf))
+_TEMP_RISKS = (0.8, 0.4, 0.0, 0.5, 0.7, 0.9)
+_TEMP_CRITICAL = ("Hypothermia", None, None, None, None, "High fever")
+
+_AGE_BREAKS = (18, 51, 66, 81)
+_AGE_RISKS = (0.4, 0.0, 0.3, 0.5, 0.7)
+
+# Weight factors (can be adjusted based on clinical importance)
+_VITAL_WEIGHT = 0.4
+_SYMPTOM_WEIGHT = 0.5
+_DEMOGRAPHIC_WEIGHT = 0.1
+
+# Risk multiplier for critical findings
+_CRITICAL_FACTOR = 1.2
+
+_NO_RISK_EXPLANATION = "No significant risk factors identified. Patient appears stable based on provided information."
+
+# Risk score bands shared by categorization and triage
+_RISK_BREAKS = (0.2, 0.4, 0.6, 0.8)
+_RISK_LABELS = ("Minimal", "Low", "Moderate", "High", "Critical")
+
+_TRIAGE_RECOMMENDATIONS = (
+    {
+        "priority": "Non-urgent",
+        "urgency": "Blue",
+        "action": "Routine monitoring",
+        "facility": "Outpatient Clinic",
+        "specialist": "Primary Care",
+        "timeframe": "Within 1 week"
+    },
+    {
+        "priority": "Routine",
+        "urgency": "Green",
+        "action": "Routine medical evaluation",
+        "facility": "Outpatient Clinic",
+        "specialist": "Primary Care",
+        "timeframe": "Within 72 hours"
+    },
+    {
+        "priority": "Priority",
+        "urgency": "Yellow",
+        "action": "Timely medical evaluation",
+        "facility": "Outpatient Clinic",
+        "specialist": "Primary Care or Relevant Specialty",
+        "timeframe": "Within 24 hours"
+    },
+    {
+        "priority": "Urgent",
+        "urgency": "Orange",
+        "action": "Prompt medical evaluation",
+        "facility": "Urgent Care or Emergency Department",
+        "specialist": "Internal Medicine or Emergency Medicine",
+        "timeframe": "Within 1 hour"
+    },
+    {
+        "priority": "Immediate",
+        "urgency": "Red",
+        "action": "Emergency intervention required",
+        "facility": "Emergency Department",
+        "specialist": "Emergency Medicine",
+        "timeframe": "Immediate (within 15 minutes)"
+    }
+)
+
+def _to_number(value, cast=float):
+    """Convert a numeric field with cast, returning None instead of raising on bad input."""
+    # JSON numbers usually arrive with the right type already
+    if type(value) is cast:
+        return value
+    try:
+        return cast(value)
+    except (ValueError, TypeError):
+        return None
+
+def _parse_int(text: str):
+    """Parse an integer field, returning None instead of raising on bad input."""
+    text = text.strip()
+    # Plain digits are the usual form and cannot fail; only signed or
+    # malformed values go through the exception path
+    if text.isdecimal():
+        return int(text)
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
 class RiskStratificationAgent:
     """
     Agent to predict patient risk using sophisticated rule-based logic.
@@ -14,11 +138,34 @@ class RiskStratificationAgent:
         Predicts the risk score and provides detailed risk assessment.
         Returns comprehensive risk analysis with categorization.
         """
-        age = patient_data.get("age", 50)
+        risk_assessment = self._assess_patient(patient_data)
+        
+        # Store risk assessment in shared memory
+        self.memory.store_agent_output("risk", risk_assessment)
+        
+        return risk_assessment
+
+    def run_batch(self, patients: list) -> list:
+        """
+        Predicts risk for several patients with a single shared-memory update.
+        Returns one assessment per patient, in order, identical to run().
+        The batch is stored under "risk_batch" so the single-patient "risk" entry keeps its shape.
+        """
+        assess_patient = self._assess_patient
+        assessments = [assess_patient(patient_data) for patient_data in patients]
+        
+        # Store all assessments in shared memory at once
+        self.memory.store_agent_output("risk_batch", {
+            "assessments": assessments
+        })
+        
+        return assessments
+
+    def _assess_patient(self, patient_data: dict) -> dict:
+        """Normalize one patient's inputs and run the comprehensive assessment."""
         # Convert age to int if it's a string
-        try:
-            age = int(age)
-        except (ValueError, TypeError):
+        age = _to_number(patient_data.get("age", 50), int)
+        if age is None:
             age = 50  # Default age if conversion fails
         
         vitals = patient_data.get("vitals", {})
@@ -26,12 +173,7 @@ class RiskStratificationAgent:
         gender = patient_data.get("gender", "")
         
         # Calculate comprehensive risk assessment
-        risk_assessment = self._comprehensive_risk_assessment(age, vitals, symptoms, gender)
-        
-        # Store risk assessment in shared memory
-        self.memory.store_agent_output("risk", risk_assessment)
-        
-        return risk_assessment
+        return self._comprehensive_risk_assessment(age, vitals, symptoms, gender)
 
     def _comprehensive_risk_assessment(self, age: int, vitals: dict, symptoms: str, gender: str) -> dict:
         """Calculate comprehensive risk assessment with detailed categorization."""
@@ -70,53 +212,30 @@ class RiskStratificationAgent:
         }
         
         # Heart rate risk assessment
-        heart_rate = vitals.get("heart_rate")
-        if heart_rate is not None:
-            try:
-                hr = int(heart_rate)
-                if hr > 130:
-                    risks["heart_rate_risk"] = 0.9
-                    risks["critical_vitals"].append("Severe tachycardia")
-                elif hr > 120:
-                    risks["heart_rate_risk"] = 0.7
-                elif hr > 100:
-                    risks["heart_rate_risk"] = 0.4
-                elif hr < 50:
-                    risks["heart_rate_risk"] = 0.8
-                    risks["critical_vitals"].append("Severe bradycardia")
-                elif hr < 60:
-                    risks["heart_rate_risk"] = 0.3
-            except (ValueError, TypeError):
-                pass
+        hr = _to_number(vitals.get("heart_rate"), int)
+        if hr is not None:
+            band = bisect_right(_HR_BREAKS, hr)
+            risks["heart_rate_risk"] = _HR_RISKS[band]
+            if _HR_CRITICAL[band]:
+                risks["critical_vitals"].append(_HR_CRITICAL[band])
         
         # Temperature risk assessment
-        temperature = vitals.get("temperature")
-        if temperature is not None:
-            try:
-                temp = float(temperature)
-                if temp > 39.5:
-                    risks["temperature_risk"] = 0.9
-                    risks["critical_vitals"].append("High fever")
-                elif temp > 39.0:
-                    risks["temperature_risk"] = 0.7
-                elif temp > 38.0:
-                    risks["temperature_risk"] = 0.5
-                elif temp < 35.0:
-                    risks["temperature_risk"] = 0.8
-                    risks["critical_vitals"].append("Hypothermia")
-                elif temp < 36.0:
-                    risks["temperature_risk"] = 0.4
-            except (ValueError, TypeError):
-                pass
+        temp = _to_number(vitals.get("temperature"))
+        # NaN fails every comparison, so it scores no risk
+        if temp is not None and not math.isnan(temp):
+            band = bisect_right(_TEMP_BREAKS, temp)
+            risks["temperature_risk"] = _TEMP_RISKS[band]
+            if _TEMP_CRITICAL[band]:
+                risks["critical_vitals"].append(_TEMP_CRITICAL[band])
         
         # Blood pressure risk assessment
         blood_pressure = vitals.get("blood_pressure")
-        if blood_pressure is not None:
-            try:
-                bp_parts = blood_pressure.split("/")
-                if len(bp_parts) == 2:
-                    systolic = int(bp_parts[0])
-                    diastolic = int(bp_parts[1])
+        if isinstance(blood_pressure, str):
+            systolic_text, sep, diastolic_text = blood_pressure.partition("/")
+            if sep and "/" not in diastolic_text:
+                systolic = _parse_int(systolic_text)
+                diastolic = _parse_int(diastolic_text)
+                if systolic is not None and diastolic is not None:
                     if systolic > 180 or diastolic > 120:
                         risks["blood_pressure_risk"] = 0.9
                         risks["critical_vitals"].append("Hypertensive crisis")
@@ -127,15 +246,14 @@ class RiskStratificationAgent:
                         risks["critical_vitals"].append("Severe hypotension")
                     elif systolic < 90 or diastolic < 60:
                         risks["blood_pressure_risk"] = 0.4
-            except (ValueError, TypeError):
-                pass
         
         # Calculate overall vital risk
-        risks["overall_vital_risk"] = max(
-            risks["heart_rate_risk"],
-            risks["temperature_risk"],
-            risks["blood_pressure_risk"]
-        )
+        overall_vital_risk = risks["heart_rate_risk"]
+        if risks["temperature_risk"] > overall_vital_risk:
+            overall_vital_risk = risks["temperature_risk"]
+        if risks["blood_pressure_risk"] > overall_vital_risk:
+            overall_vital_risk = risks["blood_pressure_risk"]
+        risks["overall_vital_risk"] = overall_vital_risk
         
         return risks
 
@@ -149,35 +267,16 @@ class RiskStratificationAgent:
             "identified_symptoms": []
         }
         
-        # Critical symptoms (high risk)
-        critical_symptoms = [
-            ("chest pain", 0.9),
-            ("shortness of breath", 0.85),
-            ("loss of consciousness", 0.95),
-            ("severe headache", 0.7),
-            ("difficulty breathing", 0.9),
-            ("severe dizziness", 0.75),
-            ("persistent vomiting", 0.6),
-            ("high fever", 0.7),
-            ("severe abdominal pain", 0.7)
-        ]
-        
-        # Moderate symptoms
-        moderate_symptoms = [
-            ("fatigue", 0.3),
-            ("mild fever", 0.4),
-            ("nausea", 0.35),
-            ("dizziness", 0.4),
-            ("cough", 0.2),
-            ("sore throat", 0.15)
-        ]
-        
         symptoms_lower = symptoms.lower()
+        found = {match.group(1) for match in _SYMPTOM_RE.finditer(symptoms_lower)}
+        identified = set()
         
         # Check for critical symptoms
-        for symptom, risk_value in critical_symptoms:
-            if symptom in symptoms_lower:
-                risks["critical_symptom_risk"] = max(risks["critical_symptom_risk"], risk_value)
+        for symptom, risk_value in _CRITICAL_SYMPTOMS:
+            if symptom in found:
+                if risk_value > risks["critical_symptom_risk"]:
+                    risks["critical_symptom_risk"] = risk_value
+                identified.add(symptom)
                 risks["identified_symptoms"].append({
                     "symptom": symptom,
                     "severity": "critical",
@@ -185,10 +284,12 @@ class RiskStratificationAgent:
                 })
         
         # Check for moderate symptoms
-        for symptom, risk_value in moderate_symptoms:
-            if symptom in symptoms_lower:
-                risks["moderate_symptom_risk"] = max(risks["moderate_symptom_risk"], risk_value)
-                if not any(s["symptom"] == symptom for s in risks["identified_symptoms"]):
+        for symptom, risk_value in _MODERATE_SYMPTOMS:
+            if symptom in found:
+                if risk_value > risks["moderate_symptom_risk"]:
+                    risks["moderate_symptom_risk"] = risk_value
+                if symptom not in identified:
+                    identified.add(symptom)
                     risks["identified_symptoms"].append({
                         "symptom": symptom,
                         "severity": "moderate",
@@ -196,10 +297,9 @@ class RiskStratificationAgent:
                     })
         
         # Calculate overall symptom risk
-        risks["overall_symptom_risk"] = max(
-            risks["critical_symptom_risk"],
-            risks["moderate_symptom_risk"]
-        )
+        critical_risk = risks["critical_symptom_risk"]
+        moderate_risk = risks["moderate_symptom_risk"]
+        risks["overall_symptom_risk"] = critical_risk if critical_risk >= moderate_risk else moderate_risk
         
         return risks
 
@@ -212,81 +312,63 @@ class RiskStratificationAgent:
         }
         
         # Age risk assessment
-        if age > 80:
-            risks["age_risk"] = 0.7
-        elif age > 65:
-            risks["age_risk"] = 0.5
-        elif age > 50:
-            risks["age_risk"] = 0.3
-        elif age < 18:
-            risks["age_risk"] = 0.4  # Pediatric risk
-        elif age < 5:
-            risks["age_risk"] = 0.6  # High pediatric risk
+        risks["age_risk"] = _AGE_RISKS[bisect_right(_AGE_BREAKS, age)]
         
         # Gender-specific considerations (simplified)
         if gender.lower() in ["male", "female"]:
             risks["gender_risk"] = 0.1  # Minimal baseline risk
         
         # Calculate overall demographic risk
-        risks["overall_demographic_risk"] = max(
-            risks["age_risk"],
-            risks["gender_risk"]
-        )
+        age_risk = risks["age_risk"]
+        gender_risk = risks["gender_risk"]
+        risks["overall_demographic_risk"] = age_risk if age_risk >= gender_risk else gender_risk
         
         return risks
 
     def _calculate_weighted_risk_score(self, vital_risks: dict, symptom_risks: dict, demographic_risks: dict) -> float:
         """Calculate weighted risk score based on all risk factors."""
-        # Weight factors (can be adjusted based on clinical importance)
-        vital_weight = 0.4
-        symptom_weight = 0.5
-        demographic_weight = 0.1
-        
         # Calculate weighted components
-        weighted_vital_risk = vital_risks["overall_vital_risk"] * vital_weight
-        weighted_symptom_risk = symptom_risks["overall_symptom_risk"] * symptom_weight
-        weighted_demographic_risk = demographic_risks["overall_demographic_risk"] * demographic_weight
+        weighted_vital_risk = vital_risks["overall_vital_risk"] * _VITAL_WEIGHT
+        weighted_symptom_risk = symptom_risks["overall_symptom_risk"] * _SYMPTOM_WEIGHT
+        weighted_demographic_risk = demographic_risks["overall_demographic_risk"] * _DEMOGRAPHIC_WEIGHT
         
         # Combine weighted risks
         total_risk = weighted_vital_risk + weighted_symptom_risk + weighted_demographic_risk
         
         # Apply critical factor multiplier if critical vitals or symptoms are present
         critical_factor = 1.0
-        if (vital_risks["critical_vitals"] and len(vital_risks["critical_vitals"]) > 0) or \
-           any(s["severity"] == "critical" for s in symptom_risks["identified_symptoms"]):
-            critical_factor = 1.2  # Increase risk for critical findings
+        # Every critical symptom carries a positive risk, so a non-zero critical
+        # risk means one was identified
+        if vital_risks["critical_vitals"] or symptom_risks["critical_symptom_risk"] > 0:
+            critical_factor = _CRITICAL_FACTOR  # Increase risk for critical findings
         
         return min(1.0, total_risk * critical_factor)
 
     def _categorize_risk_level(self, risk_score: float) -> str:
         """Categorize risk level based on score."""
-        if risk_score >= 0.8:
-            return "Critical"
-        elif risk_score >= 0.6:
-            return "High"
-        elif risk_score >= 0.4:
-            return "Moderate"
-        elif risk_score >= 0.2:
-            return "Low"
-        else:
-            return "Minimal"
+        return _RISK_LABELS[bisect_right(_RISK_BREAKS, risk_score)]
 
     def _generate_risk_explanation(self, vital_risks: dict, symptom_risks: dict, demographic_risks: dict) -> str:
         """Generate detailed explanation of risk assessment."""
+        # Nothing to explain, so skip building the explanation list
+        if not vital_risks["critical_vitals"] and vital_risks["overall_vital_risk"] <= 0 and \
+           symptom_risks["overall_symptom_risk"] <= 0 and demographic_risks["overall_demographic_risk"] <= 0:
+            return _NO_RISK_EXPLANATION
+        
         explanations = []
         
         # Vital risks explanation
-        if vital_risks["critical_vitals"] and len(vital_risks["critical_vitals"]) > 0:
-            explanations.append(f"Critical vital signs detected: {', '.join(vital_risks['critical_vitals'])}")
+        critical_vitals = vital_risks["critical_vitals"]
+        if critical_vitals:
+            explanations.append(f"Critical vital signs detected: {', '.join(critical_vitals)}")
         elif vital_risks["overall_vital_risk"] > 0.5:
             explanations.append("Significant abnormalities in vital signs")
         elif vital_risks["overall_vital_risk"] > 0:
             explanations.append("Mild abnormalities in vital signs")
         
         # Symptom risks explanation
-        critical_symptoms = [s for s in symptom_risks["identified_symptoms"] if s["severity"] == "critical"]
-        if critical_symptoms:
-            symptom_names = [s["symptom"] for s in critical_symptoms]
+        if symptom_risks["critical_symptom_risk"] > 0:
+            symptom_names = [s["symptom"] for s in symptom_risks["identified_symptoms"] if s["severity"] == "critical"]
             explanations.append(f"Critical symptoms present: {', '.join(symptom_names)}")
         elif symptom_risks["overall_symptom_risk"] > 0.5:
             explanations.append("Moderate symptom burden")
@@ -299,55 +381,9 @@ class RiskStratificationAgent:
         elif demographic_risks["overall_demographic_risk"] > 0:
             explanations.append("Moderate demographic risk factors")
         
-        if not explanations:
-            return "No significant risk factors identified. Patient appears stable based on provided information."
-        
         return "Risk factors identified: " + "; ".join(explanations)
 
     def _generate_triage_recommendation(self, risk_score: float) -> dict:
         """Generate triage recommendation based on risk score."""
-        if risk_score >= 0.8:
-            return {
-                "priority": "Immediate",
-                "urgency": "Red",
-                "action": "Emergency intervention required",
-                "facility": "Emergency Department",
-                "specialist": "Emergency Medicine",
-                "timeframe": "Immediate (within 15 minutes)"
-            }
-        elif risk_score >= 0.6:
-            return {
-                "priority": "Urgent",
-                "urgency": "Orange",
-                "action": "Prompt medical evaluation",
-                "facility": "Urgent Care or Emergency Department",
-                "specialist": "Internal Medicine or Emergency Medicine",
-                "timeframe": "Within 1 hour"
-            }
-        elif risk_score >= 0.4:
-            return {
-                "priority": "Priority",
-                "urgency": "Yellow",
-                "action": "Timely medical evaluation",
-                "facility": "Outpatient Clinic",
-                "specialist": "Primary Care or Relevant Specialty",
-                "timeframe": "Within 24 hours"
-            }
-        elif risk_score >= 0.2:
-            return {
-                "priority": "Routine",
-                "urgency": "Green",
-                "action": "Routine medical evaluation",
-                "facility": "Outpatient Clinic",
-                "specialist": "Primary Care",
-                "timeframe": "Within 72 hours"
-            }
-        else:
-            return {
-                "priority": "Non-urgent",
-                "urgency": "Blue",
-                "action": "Routine monitoring",
-                "facility": "Outpatient Clinic",
-                "specialist": "Primary Care",
-                "timeframe": "Within 1 week"
-            }
\ No newline at end of file
+        # The recommendations are shared read-only; callers only read them
+        return _TRIAGE_RECOMMENDATIONS[bisect_right(_RISK_BREAKS, risk_score)]
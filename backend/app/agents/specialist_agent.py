@@ -1,7 +1,71 @@
+import math
 import re
-from typing import Dict, List, Any
+from typing import List, Any, NamedTuple
 from app.core.agent_memory import get_agent_memory
 
+# Symptom phrases that point to a condition in _identify_conditions
+_CONDITION_KEYWORDS = (
+    "chest pain", "chest discomfort", "shortness of breath", "difficulty breathing", "fever",
+    "headache", "severe", "seizure", "convulsion", "diabetes", "hyperglycemia", "hypoglycemia",
+    "thyroid", "bleeding", "jaundice", "yellow skin", "abdominal pain", "joint pain", "arthritis",
+    "rash", "skin lesion", "back pain", "stiffness", "kidney", "renal", "anemia", "fatigue",
+    "pallor", "cancer", "tumor", "malignancy", "bone pain", "fracture"
+)
+
+# One scan finds every keyword; no keyword is a prefix of another, and the
+# lookahead keeps overlapping occurrences, so each phrase is reported exactly
+# as a substring test would
+_CONDITION_KEYWORD_RE = re.compile("(?=(" + "|".join(map(re.escape, _CONDITION_KEYWORDS)) + "))")
+
+# Complexity weighting for conditions and vitals
+_CRITICAL_CONDITIONS = frozenset({"myocardial_infarction", "stroke", "pulmonary_embolism", "cardiac_arrest", "sepsis"})
+_SEVERE_CONDITIONS = frozenset({"heart_failure", "pneumonia", "meningitis", "diabetes_ketoacidosis"})
+_SEVERE_VITALS = frozenset({"severe_hypotension", "severe_tachycardia", "hypoxia", "hypertensive_crisis"})
+
+# Medications counted towards treatment complexity
+_MEDICATION_RE = re.compile("|".join([
+    "aspirin", "warfarin", "metformin", "lisinopril", "atorvastatin",
+    "omeprazole", "albuterol", "insulin", "metoprolol", "losartan"
+]))
+
+_NAN = float("nan")
+
+class _Vitals(NamedTuple):
+    """Numeric vital sign readings, NaN when missing or unparseable."""
+    heart_rate: float
+    temperature: float
+    systolic: float
+    diastolic: float
+
+    def has_blood_pressure(self) -> bool:
+        """True when both blood pressure readings parsed."""
+        return not (math.isnan(self.systolic) or math.isnan(self.diastolic))
+
+def _parse_reading(value: Any, cast) -> float:
+    """Convert a vital sign reading with cast, NaN if it is missing or malformed."""
+    if value is None:
+        return _NAN
+    try:
+        return cast(value)
+    except (ValueError, TypeError):
+        return _NAN
+
+def _parse_vitals(vitals: dict) -> _Vitals:
+    """Parse heart rate, temperature and "systolic/diastolic" blood pressure once per patient."""
+    systolic = diastolic = _NAN
+    blood_pressure = vitals.get("blood_pressure")
+    if isinstance(blood_pressure, str):
+        systolic_text, sep, diastolic_text = blood_pressure.partition("/")
+        if sep and "/" not in diastolic_text:
+            systolic = _parse_reading(systolic_text, int)
+            diastolic = _parse_reading(diastolic_text, int)
+    return _Vitals(
+        heart_rate=_parse_reading(vitals.get("heart_rate"), int),
+        temperature=_parse_reading(vitals.get("temperature"), float),
+        systolic=systolic,
+        diastolic=diastolic
+    )
+
 class SpecialistConsultationAgent:
     """
     Agent to recommend appropriate specialists based on case complexity and patient conditions.
@@ -146,6 +210,12 @@ class SpecialistConsultationAgent:
             }
         }
         
+        # Inverted index from each condition to the specialists that treat it
+        self._condition_specialists = {}
+        for specialist, info in self.specialist_recommendations.items():
+            for condition in info["conditions"]:
+                self._condition_specialists.setdefault(condition, []).append(specialist)
+        
         # Enhanced complexity assessment criteria with more granular thresholds
         self.complexity_criteria = {
             "high_complexity": {
@@ -176,40 +246,23 @@ class SpecialistConsultationAgent:
         """
         # Extract relevant information
         symptoms = patient_data.get("symptoms", "")
-        vitals = patient_data.get("vitals", {})
+        vitals = _parse_vitals(patient_data.get("vitals", {}))
         age = patient_data.get("age", 0)
         gender = patient_data.get("gender", "")
         
+        # Identify conditions once; complexity and recommendations share them
+        conditions = self._identify_conditions(symptoms, vitals)
+        
         # Identify patient complexity
         complexity_level = self._assess_patient_complexity(
-            symptoms, vitals, risk_assessment, treatment_recommendations
+            conditions, vitals, risk_assessment, treatment_recommendations
         )
         
-        # Generate enhanced specialist recommendations
-        enhanced_recommendations = self._generate_enhanced_specialist_recommendations(
-            symptoms, vitals, risk_assessment, complexity_level
+        # Generate specialist recommendations with the overall confidence score
+        recommendations = self._generate_specialist_recommendations(
+            conditions, risk_assessment, complexity_level
         )
         
-        # Use enhanced recommendations or fall back to standard ones
-        if enhanced_recommendations:
-            specialist_recommendations = enhanced_recommendations
-        else:
-            standard_result = self._generate_specialist_recommendations(
-                symptoms, vitals, risk_assessment, complexity_level
-            )
-            specialist_recommendations = standard_result.get("specialist_recommendations", [])
-        
-        # Calculate overall confidence score
-        conditions = self._identify_conditions(symptoms, vitals)
-        overall_confidence = self._calculate_confidence_score(conditions)
-        
-        recommendations = {
-            "specialist_recommendations": specialist_recommendations,
-            "complexity_level": complexity_level,
-            "confidence_score": overall_confidence,
-            "additional_considerations": self._generate_additional_considerations(complexity_level)
-        }
-        
         # Store recommendations in shared memory
         self.memory.store_agent_output("specialist", {
             "patient_data": patient_data,
@@ -218,7 +271,7 @@ class SpecialistConsultationAgent:
         
         return recommendations
 
-    def _assess_patient_complexity(self, symptoms: str, vitals: dict, risk_assessment: dict,
+    def _assess_patient_complexity(self, conditions: List[str], vitals: _Vitals, risk_assessment: dict,
                                   treatment_recommendations: dict) -> str:
         """Assess patient complexity based on multiple factors with enhanced scoring."""
         complexity_score = 0
@@ -235,18 +288,15 @@ class SpecialistConsultationAgent:
             complexity_score += 1
             
         # Condition-based complexity with severity weighting
-        conditions = self._identify_conditions(symptoms, vitals)
-        critical_conditions = ["myocardial_infarction", "stroke", "pulmonary_embolism", "cardiac_arrest", "sepsis"]
-        severe_conditions = ["heart_failure", "pneumonia", "meningitis", "diabetes_ketoacidosis"]
-        
-        critical_count = sum(1 for cond in conditions if cond in critical_conditions)
-        severe_count = sum(1 for cond in conditions if cond in severe_conditions)
+        # Conditions are already deduplicated, so the overlap sizes are the counts
+        critical_count = len(_CRITICAL_CONDITIONS.intersection(conditions))
+        severe_count = len(_SEVERE_CONDITIONS.intersection(conditions))
         
         complexity_score += (critical_count * 3) + (severe_count * 2) + (len(conditions) - critical_count - severe_count)
             
         # Vital-based complexity with severity weighting
         critical_vitals = self._identify_critical_vitals(vitals)
-        severe_vitals = [vital for vital in critical_vitals if vital in ["severe_hypotension", "severe_tachycardia", "hypoxia", "hypertensive_crisis"]]
+        severe_vitals = [vital for vital in critical_vitals if vital in _SEVERE_VITALS]
         
         complexity_score += (len(severe_vitals) * 2) + (len(critical_vitals) - len(severe_vitals))
         
@@ -254,9 +304,7 @@ class SpecialistConsultationAgent:
         treatment_plan = treatment_recommendations.get("treatment_plan", {})
         primary_recs = treatment_plan.get("primary_recommendations", [])
         # Simple estimation of medication count based on recommendation length
-        medication_count = sum(1 for rec in primary_recs if any(med in rec.lower() for med in 
-                             ["aspirin", "warfarin", "metformin", "lisinopril", "atorvastatin", 
-                              "omeprazole", "albuterol", "insulin", "metoprolol", "losartan"]))
+        medication_count = sum(1 for rec in primary_recs if _MEDICATION_RE.search(rec.lower()))
         
         if medication_count > 6:
             complexity_score += 3
@@ -273,45 +321,45 @@ class SpecialistConsultationAgent:
         else:
             return "low_complexity"
 
-    def _identify_conditions(self, symptoms: str, vitals: dict) -> List[str]:
+    def _identify_conditions(self, symptoms: str, vitals: _Vitals) -> List[str]:
         """Identify medical conditions based on symptoms and vitals with enhanced detection."""
         conditions = []
-        symptoms_lower = symptoms.lower()
+        found = {match.group(1) for match in _CONDITION_KEYWORD_RE.finditer(symptoms.lower())}
         
         # Enhanced symptom-based condition identification
-        if "chest pain" in symptoms_lower or "chest discomfort" in symptoms_lower:
+        if "chest pain" in found or "chest discomfort" in found:
             conditions.append("chest_pain")
-        if "shortness of breath" in symptoms_lower or "difficulty breathing" in symptoms_lower:
+        if "shortness of breath" in found or "difficulty breathing" in found:
             conditions.append("shortness_of_breath")
-        if "fever" in symptoms_lower or self._has_fever(vitals):
+        if "fever" in found or self._has_fever(vitals):
             conditions.append("fever")
-        if "headache" in symptoms_lower and "severe" in symptoms_lower:
+        if "headache" in found and "severe" in found:
             conditions.append("headache")
-        if "seizure" in symptoms_lower or "convulsion" in symptoms_lower:
+        if "seizure" in found or "convulsion" in found:
             conditions.append("seizure")
-        if "diabetes" in symptoms_lower or "hyperglycemia" in symptoms_lower or "hypoglycemia" in symptoms_lower:
+        if "diabetes" in found or "hyperglycemia" in found or "hypoglycemia" in found:
             conditions.append("diabetes")
-        if "thyroid" in symptoms_lower:
+        if "thyroid" in found:
             conditions.append("thyroid_disorder")
-        if "bleeding" in symptoms_lower:
+        if "bleeding" in found:
             conditions.append("gi_bleeding")
-        if "jaundice" in symptoms_lower or "yellow skin" in symptoms_lower:
+        if "jaundice" in found or "yellow skin" in found:
             conditions.append("liver_disease")
-        if "abdominal pain" in symptoms_lower:
+        if "abdominal pain" in found:
             conditions.append("acute_abdomen")
-        if "joint pain" in symptoms_lower or "arthritis" in symptoms_lower:
+        if "joint pain" in found or "arthritis" in found:
             conditions.append("rheumatoid_arthritis")
-        if "rash" in symptoms_lower or "skin lesion" in symptoms_lower:
+        if "rash" in found or "skin lesion" in found:
             conditions.append("lupus")
-        if "back pain" in symptoms_lower and "stiffness" in symptoms_lower:
+        if "back pain" in found and "stiffness" in found:
             conditions.append("ankylosing_spondylitis")
-        if "kidney" in symptoms_lower or "renal" in symptoms_lower:
+        if "kidney" in found or "renal" in found:
             conditions.append("kidney_disease")
-        if "anemia" in symptoms_lower or "fatigue" in symptoms_lower and "pallor" in symptoms_lower:
+        if "anemia" in found or "fatigue" in found and "pallor" in found:
             conditions.append("anemia")
-        if "cancer" in symptoms_lower or "tumor" in symptoms_lower or "malignancy" in symptoms_lower:
+        if "cancer" in found or "tumor" in found or "malignancy" in found:
             conditions.append("cancer")
-        if "bone pain" in symptoms_lower or "fracture" in symptoms_lower:
+        if "bone pain" in found or "fracture" in found:
             conditions.append("osteoporosis")
             
         # Vital-based condition identification
@@ -332,139 +380,84 @@ class SpecialistConsultationAgent:
             
         return list(set(conditions))  # Remove duplicates
     
-    def _has_bradycardia(self, vitals: dict) -> bool:
+    def _has_bradycardia(self, vitals: _Vitals) -> bool:
         """Check if patient has bradycardia based on vital signs."""
-        heart_rate = vitals.get("heart_rate")
-        if heart_rate is not None:
-            try:
-                hr = int(heart_rate)
-                return hr < 60
-            except (ValueError, TypeError):
-                return False
-        return False
+        return vitals.heart_rate < 60
     
-    def _has_electrolyte_imbalance(self, vitals: dict) -> bool:
+    def _has_electrolyte_imbalance(self, vitals: _Vitals) -> bool:
         """Check for signs of electrolyte imbalance."""
         # This is a simplified check - in practice would need lab values
         # For now, we'll use clinical indicators
         return False  # Placeholder
     
-    def _has_proteinuria(self, vitals: dict) -> bool:
+    def _has_proteinuria(self, vitals: _Vitals) -> bool:
         """Check for signs of proteinuria."""
         # This is a simplified check - in practice would need lab values
         # For now, we'll use clinical indicators
         return False  # Placeholder
 
-    def _identify_critical_vitals(self, vitals: dict) -> List[str]:
+    def _identify_critical_vitals(self, vitals: _Vitals) -> List[str]:
         """Identify critical vital signs."""
         critical_vitals = []
         
         # Heart rate
-        heart_rate = vitals.get("heart_rate")
-        if heart_rate is not None:
-            try:
-                hr = int(heart_rate)
-                if hr > 130:
-                    critical_vitals.append("severe_tachycardia")
-                elif hr < 50:
-                    critical_vitals.append("severe_bradycardia")
-            except (ValueError, TypeError):
-                pass
+        if vitals.heart_rate > 130:
+            critical_vitals.append("severe_tachycardia")
+        elif vitals.heart_rate < 50:
+            critical_vitals.append("severe_bradycardia")
         
         # Temperature
-        temperature = vitals.get("temperature")
-        if temperature is not None:
-            try:
-                temp = float(temperature)
-                if temp > 39.5:
-                    critical_vitals.append("high_fever")
-                elif temp < 35.0:
-                    critical_vitals.append("hypothermia")
-            except (ValueError, TypeError):
-                pass
+        if vitals.temperature > 39.5:
+            critical_vitals.append("high_fever")
+        elif vitals.temperature < 35.0:
+            critical_vitals.append("hypothermia")
         
         # Blood pressure
-        blood_pressure = vitals.get("blood_pressure")
-        if blood_pressure is not None:
-            try:
-                bp_parts = blood_pressure.split("/")
-                if len(bp_parts) == 2:
-                    systolic = int(bp_parts[0])
-                    diastolic = int(bp_parts[1])
-                    if systolic > 180 or diastolic > 120:
-                        critical_vitals.append("hypertensive_crisis")
-                    elif systolic < 80 or diastolic < 50:
-                        critical_vitals.append("severe_hypotension")
-            except (ValueError, TypeError):
-                pass
+        if vitals.has_blood_pressure():
+            if vitals.systolic > 180 or vitals.diastolic > 120:
+                critical_vitals.append("hypertensive_crisis")
+            elif vitals.systolic < 80 or vitals.diastolic < 50:
+                critical_vitals.append("severe_hypotension")
         
         return critical_vitals
 
-    def _has_fever(self, vitals: dict) -> bool:
+    def _has_fever(self, vitals: _Vitals) -> bool:
         """Check if patient has fever based on vital signs."""
-        temperature = vitals.get("temperature")
-        if temperature is not None:
-            try:
-                temp = float(temperature)
-                return temp > 38.0
-            except (ValueError, TypeError):
-                return False
-        return False
+        return vitals.temperature > 38.0
 
-    def _has_hypertension(self, vitals: dict) -> bool:
+    def _has_hypertension(self, vitals: _Vitals) -> bool:
         """Check if patient has hypertension based on vital signs."""
-        blood_pressure = vitals.get("blood_pressure")
-        if blood_pressure is not None:
-            try:
-                bp_parts = blood_pressure.split("/")
-                if len(bp_parts) == 2:
-                    systolic = int(bp_parts[0])
-                    diastolic = int(bp_parts[1])
-                    return systolic > 140 or diastolic > 90
-            except (ValueError, TypeError):
-                return False
-        return False
+        return vitals.has_blood_pressure() and (vitals.systolic > 140 or vitals.diastolic > 90)
 
-    def _has_hypotension(self, vitals: dict) -> bool:
+    def _has_hypotension(self, vitals: _Vitals) -> bool:
         """Check if patient has hypotension based on vital signs."""
-        blood_pressure = vitals.get("blood_pressure")
-        if blood_pressure is not None:
-            try:
-                bp_parts = blood_pressure.split("/")
-                if len(bp_parts) == 2:
-                    systolic = int(bp_parts[0])
-                    return systolic < 90
-            except (ValueError, TypeError):
-                return False
-        return False
+        # Only the systolic reading is consulted, so an unreadable diastolic is ignored
+        return vitals.systolic < 90
 
-    def _has_tachycardia(self, vitals: dict) -> bool:
+    def _has_tachycardia(self, vitals: _Vitals) -> bool:
         """Check if patient has tachycardia based on vital signs."""
-        heart_rate = vitals.get("heart_rate")
-        if heart_rate is not None:
-            try:
-                hr = int(heart_rate)
-                return hr > 100
-            except (ValueError, TypeError):
-                return False
-        return False
+        return vitals.heart_rate > 100
 
-    def _generate_specialist_recommendations(self, symptoms: str, vitals: dict, 
+    def _generate_specialist_recommendations(self, conditions: List[str], 
                                            risk_assessment: dict, complexity_level: str) -> dict:
         """Generate specialist recommendations based on patient conditions and complexity."""
-        # Identify conditions requiring specialist consultation
-        conditions = self._identify_conditions(symptoms, vitals)
+        # Group the patient's conditions by the specialists that treat them
+        conditions_by_specialist = {}
+        for cond in conditions:
+            for specialist in self._condition_specialists.get(cond, ()):
+                conditions_by_specialist.setdefault(specialist, []).append(cond)
+        
+        # Determine urgency based on risk assessment and complexity
+        urgency = self._determine_urgency(risk_assessment, complexity_level)
         
         # Generate recommendations for each relevant specialist
         specialist_recommendations = []
         
         for specialist, info in self.specialist_recommendations.items():
             # Check if any of the patient's conditions match this specialist's expertise
-            matching_conditions = [cond for cond in conditions if cond in info["conditions"]]
+            matching_conditions = conditions_by_specialist.get(specialist)
             
             if matching_conditions:
-                # Determine urgency based on risk assessment and complexity
-                urgency = self._determine_urgency(risk_assessment, complexity_level)
                 urgency_description = info["urgency_levels"].get(urgency, "Consult as clinically indicated")
                 
                 # Get consultation details based on urgency
@@ -553,134 +546,3 @@ class SpecialistConsultationAgent:
         # Calculate final confidence with caps
         final_confidence = min(base_confidence + confidence_boost + specificity_boost, 0.98)  # Cap at 0.98
         return round(final_confidence, 3)
-    
-    def _generate_enhanced_specialist_recommendations(self, symptoms: str, vitals: dict, 
-                                                    risk_assessment: dict, complexity_level: str) -> List[Dict[str, Any]]:
-        """Generate enhanced specialist recommendations using external databases for better coverage."""
-        # Start with our standard recommendations
-        standard_recommendations = self._generate_specialist_recommendations(symptoms, vitals, risk_assessment, complexity_level)
-        enhanced_recommendations = standard_recommendations.get("specialist_recommendations", [])
-        
-        # Enhanced specialist database with more detailed information
-        enhanced_specialist_database = {
-            "cardiology": {
-                "subspecialties": ["interventional_cardiology", "electrophysiology", "heart_failure"],
-                "conditions": ["chest_pain", "heart_failure", "arrhythmia", "hypertension", "myocardial_infarction", 
-                              "valvular_disease", "cardiomyopathy", "pericarditis", "endocarditis"],
-                "urgency_levels": {
-                    "immediate": "Within 15 minutes - Cardiac emergency",
-                    "urgent": "Within 2 hours - High-risk cardiac condition",
-                    "routine": "Within 24-48 hours - Stable cardiac condition"
-                },
-                "consultation_details": {
-                    "emergency": "Prepare for possible cardiac catheterization",
-                    "routine": "Bring recent ECG and cardiac enzymes"
-                }
-            },
-            "pulmonology": {
-                "subspecialties": ["critical_care", "sleep_medicine", "interstitial_lung_disease"],
-                "conditions": ["shortness_of_breath", "asthma", "copd", "pneumonia", "pulmonary_embolism", 
-                              "lung_cancer", "pulmonary_hypertension", "sleep_apnea", "pulmonary_fibrosis"],
-                "urgency_levels": {
-                    "immediate": "Within 30 minutes - Respiratory emergency",
-                    "urgent": "Within 4 hours - Significant respiratory compromise",
-                    "routine": "Within 1-2 weeks - Stable respiratory condition"
-                },
-                "consultation_details": {
-                    "emergency": "Prepare arterial blood gas results",
-                    "routine": "Bring chest X-ray and pulmonary function tests"
-                }
-            },
-            "neurology": {
-                "subspecialties": ["stroke", "epilepsy", "movement_disorders", "neuromuscular"],
-                "conditions": ["headache", "seizure", "stroke", "altered_mental_status", "migraine", 
-                              "parkinsons", "multiple_sclerosis", "alzheimers", "neuropathy"],
-                "urgency_levels": {
-                    "immediate": "Within 15 minutes - Neurological emergency",
-                    "urgent": "Within 2 hours - Significant neurological deficit",
-                    "routine": "Within 1 week - Chronic neurological condition"
-                },
-                "consultation_details": {
-                    "emergency": "Prepare for possible CT/MRI imaging",
-                    "routine": "Bring neurological examination findings"
-                }
-            },
-            "endocrinology": {
-                "subspecialties": ["diabetes", "thyroid", "reproductive_endocrinology"],
-                "conditions": ["diabetes", "thyroid_disorder", "adrenal_insufficiency", "osteoporosis", 
-                              "parathyroid_disorder", "pituitary_disorder", "reproductive_disorder"],
-                "urgency_levels": {
-                    "immediate": "Within 1 hour - Endocrine emergency",
-                    "urgent": "Within 4 hours - Significant endocrine dysfunction",
-                    "routine": "Within 1 week - Chronic endocrine condition"
-                },
-                "consultation_details": {
-                    "emergency": "Provide recent glucose and electrolyte levels",
-                    "routine": "Bring endocrine function test results"
-                }
-            },
-            "gastroenterology": {
-                "subspecialties": ["hepatology", "inflammatory_bowel_disease", "endoscopy"],
-                "conditions": ["gi_bleeding", "liver_disease", "pancreatitis", "inflammatory_bowel_disease", 
-                              "gallstones", "cirrhosis", "hepatitis", "GERD"],
-                "urgency_levels": {
-                    "immediate": "Within 1 hour - GI emergency",
-                    "urgent": "Within 4 hours - Significant GI condition",
-                    "routine": "Within 1 week - Chronic GI condition"
-                },
-                "consultation_details": {
-                    "emergency": "Prepare for possible endoscopy",
-                    "routine": "Bring recent liver function tests and imaging"
-                }
-            }
-        }
-        
-        # Identify conditions requiring specialist consultation
-        conditions = self._identify_conditions(symptoms, vitals)
-        
-        # Check for additional specialists that might be needed based on enhanced database
-        for specialist, info in enhanced_specialist_database.items():
-            # Check if any of the patient's conditions match this specialist's expertise
-            matching_conditions = [cond for cond in conditions if cond in info["conditions"]]
-            
-            # If we found matching conditions and this specialist isn't already recommended
-            if matching_conditions and not any(rec["specialist"].lower() == specialist.lower() for rec in enhanced_recommendations):
-                # Determine urgency based on risk assessment and complexity
-                urgency = self._determine_urgency(risk_assessment, complexity_level)
-                urgency_description = info["urgency_levels"].get(urgency, "Consult as clinically indicated")
-                
-                # Get consultation details based on urgency
-                consultation_type = "emergency" if urgency in ["immediate", "urgent"] else "routine"
-                consultation_details = info["consultation_details"].get(consultation_type, "")
-                
-                enhanced_recommendations.append({
-                    "specialist": specialist.title(),
-                    "subspecialties": info.get("subspecialties", []),
-                    "conditions": matching_conditions,
-                    "urgency": urgency,
-                    "urgency_description": urgency_description,
-                    "consultation_details": consultation_details,
-                    "reasoning": f"Patient presents with {', '.join(matching_conditions)} requiring {specialist} expertise",
-                    "confidence_score": self._calculate_specialist_confidence(specialist, matching_conditions)
-                })
-        
-        return enhanced_recommendations
-    
-    def _calculate_specialist_confidence(self, specialist: str, matching_conditions: List[str]) -> float:
-        """Calculate confidence score for a specific specialist recommendation."""
-        # Base confidence based on number of matching conditions
-        base_confidence = min(0.6 + (len(matching_conditions) * 0.1), 0.9)
-        
-        # Specialist-specific confidence adjustments
-        specialist_confidence = {
-            "cardiology": 0.95,
-            "neurology": 0.92,
-            "pulmonology": 0.90,
-            "endocrinology": 0.85,
-            "gastroenterology": 0.85
-        }
-        
-        specialist_boost = specialist_confidence.get(specialist.lower(), 0.1)
-        final_confidence = min(base_confidence * specialist_boost, 0.98)
-        
-        return round(final_confidence, 3)
\ No newline at end of file
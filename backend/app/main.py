@@ -8,6 +8,7 @@ import time
 from app.core.config import settings
 from app.routes import triage, metrics, database, advanced_agents
 from app.core.embedding import EmbeddingModel
+from app.agents.rag_agent import warmup_knowledge_base
 import logging
 
 # Configure logging
@@ -40,6 +41,8 @@ app.add_middleware(
 async def startup_event():
     # Initialize the embedding model on startup
     EmbeddingModel.get_instance()
+    # Open the guideline store and load its query embedder ahead of the first request
+    warmup_knowledge_base()
     # Increment initial metrics to ensure there's data to display
     REQUEST_COUNT.labels(method="GET", endpoint="/", http_status="200").inc()
 
@@ -178,20 +178,13 @@ async def get_predictive_analytics(request: AgentRequest):
     """
     try:
         agent = PredictiveAnalyticsAgent()
-        # Run the agent in a thread pool to avoid blocking the event loop
-        import asyncio
-        from concurrent.futures import ThreadPoolExecutor
-        
-        def run_agent():
-            return agent.run(
-                request.patient_data,
-                request.symptoms_analysis or {},
-                request.risk_assessment or {},
-                request.treatment_recommendations or {}
-            )
-        
-        with ThreadPoolExecutor() as executor:
-            result = await asyncio.get_event_loop().run_in_executor(executor, run_agent)
+        # Run the agent off the event loop
+        result = await agent.arun(
+            request.patient_data,
+            request.symptoms_analysis or {},
+            request.risk_assessment or {},
+            request.treatment_recommendations or {}
+        )
         
         return AgentResponse(success=True, data=result)
     except Exception as e:
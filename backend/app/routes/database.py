@@ -11,8 +11,9 @@ async def initialize_database():
     Initializes the ChromaDB with sample clinical guidelines.
     """
     try:
-        # Initialize RAG agent which will automatically load default guidelines
+        # Initialize RAG agent and load default guidelines if the collection is empty
         rag_agent = KnowledgeRAGAgent()
+        rag_agent.ensure_seeded()
         
         # Test the initialization with a sample query
         test_results = rag_agent.run("chest pain and shortness of breath")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+import asyncio
+import copy
+import math
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.agents.predictive_analytics_agent import PredictiveAnalyticsAgent
+
+
+def _indicators(result: dict) -> set:
+    """All vital sign indicators reported across the predictions."""
+    return {
+        indicator
+        for prediction in result["complication_predictions"]
+        for indicator in prediction["indicators_present"]
+    }
+
+
+def test_oxygen_saturation_string_and_numeric():
+    """Percentage strings and plain numbers parse to the same reading."""
+    agent = PredictiveAnalyticsAgent()
+
+    for reading in ("92%", " 92 %", "92", "92.0", 92, 92.0):
+        vitals = agent._parse_vitals({"oxygen_saturation": reading})
+        assert vitals.oxygen_saturation == 92.0, reading
+
+    for reading in ("abc", "", None):
+        vitals = agent._parse_vitals({"oxygen_saturation": reading})
+        assert math.isnan(vitals.oxygen_saturation), reading
+
+    # Both forms flag low oxygen end to end
+    for reading in ("90%", 90):
+        result = agent.run({"vital_signs": {"oxygen_saturation": reading}}, {}, {}, {})
+        assert "error" not in result, result
+        assert "low_oxygen" in _indicators(result), reading
+
+
+def _predictions(agent: PredictiveAnalyticsAgent, patient_data: dict) -> list:
+    """Complication predictions for a fresh copy of the patient data."""
+    result = agent.run(copy.deepcopy(patient_data), {}, {}, {})
+    assert "error" not in result, result
+    return result["complication_predictions"]
+
+
+def test_complication_cache_key():
+    """Memoized predictions match for equal inputs and change with history or vitals."""
+    agent = PredictiveAnalyticsAgent()
+    patient_data = {
+        "chief_complaint": "Chest pain",
+        "age": 70,
+        "gender": "Male",
+        "medical_history": ["Diabetes"],
+        "vital_signs": {"temperature": "37.0", "heart_rate": "80", "blood_pressure": "120/80"}
+    }
+
+    first = _predictions(agent, patient_data)
+    hits = PredictiveAnalyticsAgent._predict_complications.cache_info().hits
+    second = _predictions(agent, patient_data)
+    assert second == first
+    assert PredictiveAnalyticsAgent._predict_complications.cache_info().hits == hits + 1
+
+    # Results are rebuilt from the cached predictions, so callers cannot corrupt them
+    second[0]["risk_level"] = "tampered"
+    assert _predictions(agent, patient_data) == first
+
+    # History is normalized to lower case, so only its content is part of the key
+    same_history = copy.deepcopy(patient_data)
+    same_history["medical_history"] = ["DIABETES"]
+    assert _predictions(agent, same_history) == first
+
+    more_history = copy.deepcopy(patient_data)
+    more_history["medical_history"] = ["Diabetes", "Hypertension"]
+    assert _predictions(agent, more_history) != first
+
+    abnormal_vitals = copy.deepcopy(patient_data)
+    abnormal_vitals["vital_signs"]["heart_rate"] = "130"
+    assert _predictions(agent, abnormal_vitals) != first
+
+
+def _without_timestamp(result: dict) -> dict:
+    """A result with its timestamp removed for comparison across calls."""
+    return {key: value for key, value in result.items() if key != "timestamp"}
+
+
+def test_run_batch_matches_run():
+    """Each batch result equals run() for the same case and all share one timestamp."""
+    agent = PredictiveAnalyticsAgent()
+    cases = [
+        {
+            "patient_data": {
+                "chief_complaint": "Chest pain",
+                "age": 70,
+                "gender": "Male",
+                "medical_history": ["Diabetes", "Hypertension"],
+                "vital_signs": {"heart_rate": "130", "oxygen_saturation": "90%"}
+            },
+            "symptoms_analysis": {"primary_concerns": [{"name": "Chest pain", "type": "cardiac"}]},
+            "risk_assessment": {"risk_score": 0.8},
+            "treatment_recommendations": {"medications": ["aspirin"]}
+        },
+        {"patient_data": {"chief_complaint": "Fever", "age": 30, "vital_signs": {"temperature": "39.2"}}},
+        {}
+    ]
+
+    batch = agent.run_batch(cases)
+    assert len(batch) == len(cases)
+    assert len({result["timestamp"] for result in batch}) == 1
+    for case, result in zip(cases, batch):
+        single = agent.run(
+            case.get("patient_data", {}),
+            case.get("symptoms_analysis", {}),
+            case.get("risk_assessment", {}),
+            case.get("treatment_recommendations", {})
+        )
+        assert _without_timestamp(result) == _without_timestamp(single)
+    assert batch[0]["complication_predictions"]
+    assert agent.run_batch([]) == []
+
+
+def test_arun_matches_run():
+    """The async entry point used by the /predictive-analytics route returns what run() does."""
+    agent = PredictiveAnalyticsAgent()
+    patient_data = {
+        "chief_complaint": "Shortness of breath",
+        "age": 68,
+        "gender": "Female",
+        "medical_history": ["COPD"],
+        "vital_signs": {"oxygen_saturation": "88%", "heart_rate": "118"}
+    }
+    symptoms_analysis = {"primary_concerns": [{"name": "Shortness of breath", "type": "respiratory"}]}
+
+    single = agent.run(patient_data, symptoms_analysis, {}, {})
+    awaited = asyncio.run(agent.arun(patient_data, symptoms_analysis, {}, {}))
+    assert "error" not in awaited, awaited
+    assert awaited["complication_predictions"]
+    assert _without_timestamp(awaited) == _without_timestamp(single)
+
+
+if __name__ == "__main__":
+    test_oxygen_saturation_string_and_numeric()
+    test_complication_cache_key()
+    test_run_batch_matches_run()
+    test_arun_matches_run()
+    print("All predictive analytics tests passed")
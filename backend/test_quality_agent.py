@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.agents.quality_agent import QualityAssuranceAgent
+
+
+def test_empty_inputs_fast_path_matches_general_path():
+    """The all-sections-empty shortcut reports the same findings as the full checks."""
+    agent = QualityAssuranceAgent()
+
+    # Every section empty takes the shortcut
+    fast = agent._check_completeness({}, {}, {}, {}, {}, {}, {})
+    assert fast == agent._check_completeness(None, None, None, None, None, None, None)
+
+    # One populated section that the remaining checks never read forces the general path
+    general = agent._check_completeness({}, {}, {}, {}, {}, {"interactions": []}, {})
+
+    assert fast["issues"][0]["type"] == general["issues"][0]["type"] == "missing_sections"
+    assert fast["issues"][1:] == general["issues"][1:]
+    assert fast["details"]["vitals_missing"] == general["details"]["vitals_missing"]
+    assert fast["score"] == general["score"] == 0.0
+
+
+if __name__ == "__main__":
+    test_empty_inputs_fast_path_matches_general_path()
+    print("All quality agent tests passed")
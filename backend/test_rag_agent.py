@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import threading
+import time
+from unittest import mock
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.agents import rag_agent
+from app.agents.rag_agent import KnowledgeRAGAgent, QueryCache
+
+
+class FakeCollection:
+    """Minimal stand-in for a Chroma collection that counts queries."""
+    guidelines = (
+        ("Chest pain management protocol for patients with acute coronary syndrome",
+         {"title": "Chest Pain", "category": "cardiology"}),
+        ("Fever workup in adults including sepsis screening and antipyretic treatment",
+         {"title": "Fever", "category": "infectious_disease"}),
+    )
+
+    def __init__(self):
+        self.queries = 0
+
+    def count(self):
+        return len(self.guidelines)
+
+    def query(self, query_texts, n_results):
+        self.queries += 1
+        # One result row per query text, nearest guideline first
+        rows = [self.guidelines if "chest" in text else self.guidelines[::-1] for text in query_texts]
+        return {
+            "documents": [[document for document, _ in row[:n_results]] for row in rows],
+            "metadatas": [[dict(metadata) for _, metadata in row[:n_results]] for row in rows],
+            "distances": [[0.1, 0.4][:n_results] for _ in rows]
+        }
+
+
+def test_query_cache_expiry_and_eviction():
+    """Entries expire after the TTL and the least recently used entry is evicted first."""
+    now = [1000.0]
+    with mock.patch.object(rag_agent.time, "monotonic", lambda: now[0]):
+        cache = QueryCache(max_size=2, ttl=10.0)
+
+        # Expiry
+        cache.put("a", 1)
+        now[0] += 9.9
+        assert cache.get("a") == 1
+        now[0] += 0.1
+        assert cache.get("a") is None
+        assert "a" not in cache._entries
+
+        # Eviction follows recency of use, not insertion
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+        # Re-putting an existing key refreshes its expiry
+        now[0] += 5.0
+        cache.put("a", 4)
+        now[0] += 6.0
+        assert cache.get("a") == 4
+        assert cache.get("c") is None
+
+        cache.clear()
+        assert cache.get("a") is None
+
+
+def test_concurrent_first_access_opens_collection_once():
+    """Threads racing on first use share one client and one collection."""
+    opened = []
+
+    class FakeClient:
+        def __init__(self, path):
+            opened.append(self)
+
+        def get_or_create_collection(self, name):
+            # Widen the window in which a second opener could slip in
+            time.sleep(0.05)
+            return FakeCollection()
+
+    threads_count = 16
+    barrier = threading.Barrier(threads_count)
+    collections = []
+
+    def first_access():
+        barrier.wait()
+        collections.append(rag_agent._get_collection())
+
+    saved = (rag_agent._client, rag_agent._collection)
+    rag_agent._client = rag_agent._collection = None
+    try:
+        with mock.patch.object(rag_agent.chromadb, "PersistentClient", FakeClient):
+            threads = [threading.Thread(target=first_access) for _ in range(threads_count)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        rag_agent._client, rag_agent._collection = saved
+
+    assert len(opened) == 1
+    assert len(collections) == threads_count
+    assert all(collection is collections[0] for collection in collections)
+
+
+def test_cached_results_are_private_copies():
+    """Repeat queries hit the cache, and editing one caller's results never leaks into another's."""
+    collection = FakeCollection()
+    KnowledgeRAGAgent.reset_cache()
+    try:
+        with mock.patch.object(rag_agent, "_get_collection", lambda: collection), \
+             mock.patch.object(rag_agent.settings, "ENABLE_EXTERNAL_APIS", False):
+            agent = KnowledgeRAGAgent()
+            first = agent.run("chest pain treatment")
+            second = agent.run("chest pain treatment")
+            assert collection.queries == 1
+            assert first == second and first
+
+            first[0]["content"] = "edited"
+            first[0]["metadata"]["title"] = "edited"
+            first.clear()
+            assert agent.run("chest pain treatment") == second
+            assert collection.queries == 1
+    finally:
+        KnowledgeRAGAgent.reset_cache()
+
+
+def test_run_batch_matches_run():
+    """Each batch row equals run() for its query, and the single-query "rag" entry is left alone."""
+    collection = FakeCollection()
+    queries = ["chest pain treatment", "fever and chills"]
+    KnowledgeRAGAgent.reset_cache()
+    try:
+        with mock.patch.object(rag_agent, "_get_collection", lambda: collection), \
+             mock.patch.object(rag_agent.settings, "ENABLE_EXTERNAL_APIS", False):
+            agent = KnowledgeRAGAgent()
+            singles = [agent.run(query) for query in queries]
+            last_single = agent.memory.get_agent_output("rag")
+
+            batch = agent.run_batch(queries)
+            assert batch == singles
+            assert batch[0] != batch[1]
+            assert agent.run_batch([]) == []
+
+            assert agent.memory.get_agent_output("rag") is last_single
+            assert agent.memory.get_agent_output("rag_batch") == {"queries": queries, "results": batch}
+    finally:
+        KnowledgeRAGAgent.reset_cache()
+
+
+if __name__ == "__main__":
+    test_query_cache_expiry_and_eviction()
+    test_concurrent_first_access_opens_collection_once()
+    test_cached_results_are_private_copies()
+    test_run_batch_matches_run()
+    print("All RAG agent tests passed")
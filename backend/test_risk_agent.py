@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import math
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.agents.risk_agent import RiskStratificationAgent
+from app.core.agent_memory import get_agent_memory
+
+
+def test_heart_rate_breakpoints():
+    """Strict "<" bounds at 50/60 and strict ">" bounds at 100/120/130."""
+    agent = RiskStratificationAgent()
+    expected = [
+        (49, 0.8, ["Severe bradycardia"]),
+        (50, 0.3, []),
+        (59, 0.3, []),
+        (60, 0.0, []),
+        (100, 0.0, []),
+        (101, 0.4, []),
+        (120, 0.4, []),
+        (121, 0.7, []),
+        (130, 0.7, []),
+        (131, 0.9, ["Severe tachycardia"]),
+        ("131", 0.9, ["Severe tachycardia"]),
+    ]
+    for heart_rate, risk, critical in expected:
+        risks = agent._assess_vital_risks({"heart_rate": heart_rate})
+        assert risks["heart_rate_risk"] == risk, heart_rate
+        assert risks["critical_vitals"] == critical, heart_rate
+
+
+def test_temperature_breakpoints():
+    """Strict "<" bounds at 35/36 and strict ">" bounds at 38/39/39.5, exact at the float level."""
+    agent = RiskStratificationAgent()
+    expected = [
+        (34.99, 0.8, ["Hypothermia"]),
+        (35.0, 0.4, []),
+        (35.99, 0.4, []),
+        (36.0, 0.0, []),
+        (38.0, 0.0, []),
+        (math.nextafter(38.0, math.inf), 0.5, []),
+        (39.0, 0.5, []),
+        (math.nextafter(39.0, math.inf), 0.7, []),
+        (39.5, 0.7, []),
+        (math.nextafter(39.5, math.inf), 0.9, ["High fever"]),
+        ("39.6", 0.9, ["High fever"]),
+        (float("nan"), 0.0, []),
+    ]
+    for temperature, risk, critical in expected:
+        risks = agent._assess_vital_risks({"temperature": temperature})
+        assert risks["temperature_risk"] == risk, temperature
+        assert risks["critical_vitals"] == critical, temperature
+
+
+def test_age_breakpoints():
+    """Strict "<" bound at 18 and strict ">" bounds at 50/65/80."""
+    agent = RiskStratificationAgent()
+    expected = [(0, 0.4), (4, 0.4), (17, 0.4), (18, 0.0), (50, 0.0), (51, 0.3),
+                (65, 0.3), (66, 0.5), (80, 0.5), (81, 0.7), (100, 0.7)]
+    for age, risk in expected:
+        assert agent._assess_demographic_risks(age, "")["age_risk"] == risk, age
+
+
+def test_run_batch_matches_run():
+    """Batch assessments equal per-patient runs and leave the single "risk" entry alone."""
+    agent = RiskStratificationAgent()
+    memory = get_agent_memory()
+    patients = [
+        {"age": 72, "gender": "male", "symptoms": "chest pain and shortness of breath",
+         "vitals": {"heart_rate": 135, "blood_pressure": "170/100", "temperature": 38.2}},
+        {"age": "30", "gender": "female", "symptoms": "mild headache",
+         "vitals": {"heart_rate": "72", "blood_pressure": "118/76", "temperature": "36.8"}},
+        {}
+    ]
+
+    singles = [agent.run(patient) for patient in patients]
+    last_single = memory.get_agent_output("risk")
+    assert last_single == singles[-1]
+
+    batch = agent.run_batch(patients)
+    assert batch == singles
+    assert memory.get_agent_output("risk") is last_single
+    assert memory.get_agent_output("risk_batch") == {"assessments": batch}
+
+
+if __name__ == "__main__":
+    test_heart_rate_breakpoints()
+    test_temperature_breakpoints()
+    test_age_breakpoints()
+    test_run_batch_matches_run()
+    print("All risk agent tests passed")